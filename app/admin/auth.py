@@ -6,6 +6,7 @@ from starlette.requests import Request
 from starlette.responses import RedirectResponse
 
 from app.core.config import settings
+from app.core.database import session_scope
 from app.users.service import UsersService
 
 
@@ -16,13 +17,12 @@ class AdminAuth(AuthenticationBackend):
         password = form.get("password")
 
         # Validate user with your existing authentication
-        user = await UsersService.find_one_or_none(email=email)
-        if not user:
-            return False
-
-        from app.users.auth import verify_password  # your function
+        from app.users.auth import authenticate_user  # your function
 
-        if not verify_password(password, user.hashed_password):
+        # on the primary, a replica may lag behind a new user or a rehash
+        async with session_scope() as session:
+            user = await authenticate_user(email, password, session)
+        if not user:
             return False
 
         # Save a session key SQLAdmin will use
@@ -48,7 +48,10 @@ class AdminAuth(AuthenticationBackend):
             )
 
         # Optional: verify user still exists in DB
-        user = await UsersService.find_one_or_none(id=user_session.get("id"))
+        async with session_scope() as session:
+            user = await UsersService.find_by_id_cached(
+                user_session.get("id"), session=session
+            )
         if not user:
             # session is invalid
             request.session.clear()
@@ -1,16 +1,30 @@
-from sqlalchemy import Column, Computed, Date, ForeignKey, Integer
+from sqlalchemy import Column, Computed, Date, ForeignKey, Index, Integer, func
 
 from app.core.database import Base
 
 
 class Bookings(Base):
     __tablename__ = "bookings"
+    # one partition per month of check-out, see app/bookings/partitions.py
+    __table_args__ = {"postgresql_partition_by": "RANGE (date_to)"}
 
-    id = Column(Integer, primary_key=True, index=True)
+    id = Column(Integer, primary_key=True, autoincrement=True, index=True)
     room_id = Column(ForeignKey("rooms.id"), index=True, nullable=False)
     user_id = Column(ForeignKey("users.id"), index=True, nullable=False)
-    date_from = Column(Date, nullable=False)
-    date_to = Column(Date, nullable=False)
+    date_from = Column(Date, index=True, nullable=False)
+    date_to = Column(Date, primary_key=True)  # the partition key is part of the PK
     price = Column(Integer, nullable=False)
     total_days = Column(Integer, Computed("date_to - date_from"))
     total_cost = Column(Integer, Computed("(date_to - date_from) * price"))
+
+    # ids are unique on their own, keep loading bookings by id alone
+    __mapper_args__ = {"primary_key": [id]}
+
+
+# stays of a room overlapping a period: room_id = ? AND stay && daterange(?, ?)
+Index(
+    "ix_bookings_room_id_stay",
+    Bookings.room_id,
+    func.daterange(Bookings.date_from, Bookings.date_to),
+    postgresql_using="gist",
+)
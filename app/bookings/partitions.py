@@ -0,0 +1,113 @@
+"""Monthly range partitions of ``bookings`` by check-out date.
+
+Partitions are named ``bookings_pYYYYMM`` and hold the stays with ``date_to``
+in that month. ``bookings_default`` catches stays beyond the last partition.
+"""
+
+import re
+from datetime import date
+
+from sqlalchemy import text
+from sqlalchemy.orm import Session
+
+DEFAULT_PARTITION = "bookings_default"
+PARTITION_NAME = re.compile(r"^bookings_p(\d{4})(\d{2})$")
+
+# generated columns are recomputed when rows are moved
+STORED_COLUMNS = "id, room_id, user_id, date_from, date_to, price"
+
+
+def add_months(month: date, months: int) -> date:
+    index = month.year * 12 + month.month - 1 + months
+    return date(index // 12, index % 12 + 1, 1)
+
+
+def partition_name(month: date) -> str:
+    return f"bookings_p{month:%Y%m}"
+
+
+def attached_partitions(session: Session) -> dict[date, str]:
+    """Monthly partitions currently attached to ``bookings``, by month."""
+    query = text("""
+        SELECT c.relname
+        FROM pg_inherits i
+        JOIN pg_class c ON c.oid = i.inhrelid
+        WHERE i.inhparent = 'bookings'::regclass
+        """)
+    partitions = {}
+    for name in session.scalars(query):
+        if match := PARTITION_NAME.match(name):
+            partitions[date(int(match[1]), int(match[2]), 1)] = name
+    return partitions
+
+
+def set_lock_timeout(session: Session, milliseconds: int) -> None:
+    """Give up on locks not granted in time, for the rest of the transaction.
+
+    DDL waiting for a lock on ``bookings`` queues every later query on the
+    table behind it, so a long running query would block booking writes.
+    """
+    session.execute(text(f"SET LOCAL lock_timeout = {int(milliseconds)}"))
+
+
+def create_partition(session: Session, month: date) -> str:
+    """Create the partition of ``month``, moving its rows out of the default.
+
+    The partition is created as a plain table and attached, which locks
+    ``bookings`` in SHARE UPDATE EXCLUSIVE mode instead of the ACCESS EXCLUSIVE
+    of ``CREATE TABLE ... PARTITION OF``, so bookings are still read and
+    written meanwhile. Only the default partition is locked, while it is
+    checked for rows of the month.
+    """
+    name = partition_name(month)
+    bounds = {"start": month, "end": add_months(month, 1)}
+    in_range = "date_to >= :start AND date_to < :end"
+
+    session.execute(
+        text(
+            f"CREATE TABLE {name} (LIKE bookings "
+            f"INCLUDING DEFAULTS INCLUDING GENERATED INCLUDING CONSTRAINTS)"
+        )
+    )
+    # DDL takes no bind parameters, the bounds are dates
+    check = f"date_to >= '{bounds['start']}' AND date_to < '{bounds['end']}'"
+    # lets the attach skip scanning the new table
+    session.execute(
+        text(f"ALTER TABLE {name} ADD CONSTRAINT {name}_bounds CHECK ({check})")
+    )
+
+    # the default partition must not hold rows of the month when it is attached
+    moved = session.execute(
+        text(f"SELECT count(*) FROM {DEFAULT_PARTITION} WHERE {in_range}"), bounds
+    ).scalar_one()
+    if moved:
+        session.execute(
+            text(
+                f"INSERT INTO {name} ({STORED_COLUMNS}) "
+                f"SELECT {STORED_COLUMNS} FROM {DEFAULT_PARTITION} WHERE {in_range}"
+            ),
+            bounds,
+        )
+        session.execute(
+            text(f"DELETE FROM {DEFAULT_PARTITION} WHERE {in_range}"), bounds
+        )
+
+    session.execute(
+        text(
+            f"ALTER TABLE bookings ATTACH PARTITION {name} "
+            f"FOR VALUES FROM ('{bounds['start']}') TO ('{bounds['end']}')"
+        )
+    )
+    # the partition bound enforces it from now on
+    session.execute(text(f"ALTER TABLE {name} DROP CONSTRAINT {name}_bounds"))
+    return name
+
+
+def detach_partition(session: Session, name: str) -> None:
+    """Detach a partition; it stays in the database as a plain archive table.
+
+    This locks ``bookings`` in ACCESS EXCLUSIVE mode, briefly once granted;
+    ``DETACH PARTITION ... CONCURRENTLY`` is not allowed next to a default
+    partition. Bound the wait for the lock with ``set_lock_timeout``.
+    """
+    session.execute(text(f"ALTER TABLE bookings DETACH PARTITION {name}"))
@@ -1,30 +1,63 @@
-from fastapi import APIRouter, Depends, status
-from fastapi_cache import FastAPICache
+from typing import Annotated
+
+from fastapi import APIRouter, Body, Depends, Response, status
 from fastapi_cache.decorator import cache
+from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.bookings.schemas import SBookingsCreate, SBookingsRead
+from app.bookings.schemas import (
+    BOOKING_READ,
+    BOOKINGS_LIST,
+    SBookingsCreate,
+    SBookingsRead,
+)
 from app.bookings.service import BookingsService
+from app.core.cache import invalidate_cache, tagged_key_builder
+from app.core.config import settings
+from app.core.database import get_session
+from app.core.dependencies import get_pagination
 from app.core.exceptions import BookingNotFoundException
-from app.tasks.tasks import send_booking_confirmation_email
+from app.core.responses import ModelResponse
+from app.hotels.service import HotelsService
+from app.outbox.service import BOOKING_CONFIRMATION, BOOKING_SUMMARY, OutboxService
 from app.users.dependencies import get_current_user
 from app.users.schemas import SUserRead
 
 router = APIRouter(prefix="/bookings", tags=["bookings"])
 
 
+async def invalidate_booking_cache(session: AsyncSession, user_id: int, *room_ids):
+    """Drop the user's booking list and availability of the rooms' hotels."""
+    hotels = await HotelsService.find_by_room_ids(room_ids, session=session)
+    await invalidate_cache(
+        user=user_id,
+        hotel=[hotel.id for hotel in hotels],
+        city={hotel.city for hotel in hotels},
+    )
+
+
 @router.get("", response_model=list[SBookingsRead])
-@cache(expire=120)
+@cache(expire=120, namespace="bookings", key_builder=tagged_key_builder(user="user"))
 async def get_bookings(
+    response: Response,
     user: SUserRead = Depends(get_current_user),
-) -> list[SBookingsRead]:
-    return await BookingsService.find_all(user_id=user.id)
+    page: dict = Depends(get_pagination),
+    session: AsyncSession = Depends(get_session),
+):
+    bookings = await BookingsService.find_all(user_id=user.id, session=session, **page)
+    return ModelResponse(
+        BOOKINGS_LIST.validate_python(bookings, from_attributes=True),
+        BOOKINGS_LIST,
+        response,
+    )
 
 
 @router.get("/{booking_id}", response_model=SBookingsRead)
 async def get_booking(
-    booking_id: int, user: SUserRead = Depends(get_current_user)
+    booking_id: int,
+    user: SUserRead = Depends(get_current_user),
+    session: AsyncSession = Depends(get_session),
 ) -> SBookingsRead:
-    booking = await BookingsService.find_by_id(booking_id)
+    booking = await BookingsService.find_by_id(booking_id, session=session)
     if not booking or booking.user_id != user.id:
         raise BookingNotFoundException
     return booking
@@ -32,13 +65,51 @@ async def get_booking(
 
 @router.post("", response_model=SBookingsRead)
 async def create_one(
-    booking: SBookingsCreate, user: SUserRead = Depends(get_current_user)
+    booking: SBookingsCreate,
+    user: SUserRead = Depends(get_current_user),
+    session: AsyncSession = Depends(get_session),
 ):
-    await FastAPICache.clear()
-    booking = await BookingsService.add_booking(booking=booking, user_id=user.id)
-    booking_dict = booking.model_dump()
-    send_booking_confirmation_email.delay(booking_dict, user.email)
-    return booking
+    booking = await BookingsService.add_booking(
+        booking=booking, user_id=user.id, session=session
+    )
+    # the email is queued in the booking's transaction and relayed by Celery,
+    # so it goes out exactly for the bookings that are stored
+    await OutboxService.add_one(
+        session=session,
+        event_type=BOOKING_CONFIRMATION,
+        payload={"booking": booking.model_dump(mode="json"), "email_to": user.email},
+    )
+    await session.commit()
+    await invalidate_booking_cache(session, user.id, booking.room_id)
+    return ModelResponse(booking, BOOKING_READ)
+
+
+@router.post("/batch", response_model=list[SBookingsRead])
+async def create_many(
+    bookings: Annotated[
+        list[SBookingsCreate],
+        Body(min_length=1, max_length=settings.BOOKING_BATCH_MAX),
+    ],
+    user: SUserRead = Depends(get_current_user),
+    session: AsyncSession = Depends(get_session),
+):
+    """Book several rooms at once, all or nothing, with one summary email."""
+    created = await BookingsService.add_bookings(
+        bookings=bookings, user_id=user.id, session=session
+    )
+    await OutboxService.add_one(
+        session=session,
+        event_type=BOOKING_SUMMARY,
+        payload={
+            "bookings": [booking.model_dump(mode="json") for booking in created],
+            "email_to": user.email,
+        },
+    )
+    await session.commit()
+    await invalidate_booking_cache(
+        session, user.id, *{booking.room_id for booking in created}
+    )
+    return ModelResponse(created, BOOKINGS_LIST)
 
 
 @router.put("/{booking_id}", response_model=SBookingsRead)
@@ -46,21 +117,31 @@ async def update_booking(
     booking_id: int,
     booking_data: SBookingsCreate,
     user: SUserRead = Depends(get_current_user),
+    session: AsyncSession = Depends(get_session),
 ):
-    existing_booking = await BookingsService.find_by_id(booking_id)
+    existing_booking = await BookingsService.find_by_id(booking_id, session=session)
     if not existing_booking or existing_booking.user_id != user.id:
         raise BookingNotFoundException
 
+    old_room_id = existing_booking.room_id
     updated_booking = await BookingsService.update_one(
-        existing_booking, **booking_data.model_dump()
+        existing_booking, session=session, **booking_data.model_dump()
+    )
+    await session.commit()
+    await invalidate_booking_cache(
+        session, user.id, old_room_id, updated_booking.room_id
     )
-    await FastAPICache.clear()
     return updated_booking
 
 
 @router.delete("/{booking_id}", status_code=status.HTTP_204_NO_CONTENT)
-async def delete_booking(booking_id: int, user: SUserRead = Depends(get_current_user)):
-    existing_booking = await BookingsService.find_by_id(booking_id)
+async def delete_booking(
+    booking_id: int,
+    user: SUserRead = Depends(get_current_user),
+    session: AsyncSession = Depends(get_session),
+):
+    existing_booking = await BookingsService.find_by_id(booking_id, session=session)
     if existing_booking and existing_booking.user_id == user.id:
-        await BookingsService.delete_one(existing_booking)
-        await FastAPICache.clear()
+        await BookingsService.delete_one(existing_booking, session=session)
+        await session.commit()
+        await invalidate_booking_cache(session, user.id, existing_booking.room_id)
@@ -1,6 +1,6 @@
 from datetime import date
 
-from pydantic import BaseModel, ConfigDict
+from pydantic import BaseModel, ConfigDict, TypeAdapter
 
 
 class SBookingsRead(BaseModel):
@@ -22,3 +22,7 @@ class SBookingsCreate(BaseModel):
     date_to: date
 
     model_config = ConfigDict(from_attributes=True)
+
+
+BOOKING_READ = TypeAdapter(SBookingsRead)
+BOOKINGS_LIST = TypeAdapter(list[SBookingsRead])
@@ -1,9 +1,30 @@
-from sqlalchemy import select
+from datetime import date, timedelta
+
+from sqlalchemy import (
+    Date,
+    and_,
+    delete,
+    exists,
+    func,
+    insert,
+    select,
+    text,
+    update,
+)
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
 
 from app.bookings.models import Bookings
 from app.bookings.schemas import SBookingsCreate, SBookingsRead
-from app.core.database import async_session_maker
-from app.core.exceptions import RoomCannotBeBookedException, RoomNotFoundException
+from app.core.database import session_scope
+from app.core.exceptions import (
+    BookingNotFoundException,
+    InvalidBookingPeriodException,
+    RoomCannotBeBookedException,
+    RoomNotFoundException,
+)
+from app.rooms.models import RoomInventory, Rooms
 from app.rooms.service import RoomsService
 from app.services.base import BaseService
 
@@ -12,30 +33,236 @@ class BookingsService(BaseService):
     model = Bookings
 
     @classmethod
-    async def add_booking(cls, user_id: int, booking: SBookingsCreate) -> SBookingsRead:
-        room = await RoomsService.find_one_or_none(id=booking.room_id)
-        if not room:
-            raise RoomNotFoundException
-
-        data = {
-            "room_id": booking.room_id,
-            "user_id": user_id,
-            "date_from": booking.date_from,
-            "date_to": booking.date_to,
-            "price": room.price,
-        }
-        # prevent overlapping bookings for the same room
-        async with async_session_maker() as session:
+    def overlaps_expr(cls, date_from, date_to):
+        """SQL condition for bookings sharing a night with the period.
+
+        Matches the GiST index on ``(room_id, daterange(date_from, date_to))``;
+        the plain ``date_to`` bound lets the planner skip partitions of stays
+        that ended before the period.
+        """
+        stay = func.daterange(Bookings.date_from, Bookings.date_to)
+        return and_(
+            Bookings.date_to > date_from,
+            stay.op("&&")(func.daterange(date_from, date_to)),
+        )
+
+    @classmethod
+    async def add_booking(
+        cls,
+        user_id: int,
+        booking: SBookingsCreate,
+        session: AsyncSession | None = None,
+    ) -> SBookingsRead:
+        if booking.date_from >= booking.date_to:
+            raise InvalidBookingPeriodException
+
+        # lookup, availability check and insert share one transaction,
+        # the room row lock is held until it commits
+        async with session_scope(session) as session:
+            rooms = await RoomsService.lock_rooms(session, booking.room_id)
+            room = rooms.get(booking.room_id)
+            if not room:
+                raise RoomNotFoundException
+
+            rooms_left = await RoomsService.get_rooms_left(
+                session, booking.room_id, booking.date_from, booking.date_to
+            )
+            if rooms_left < 1:
+                raise RoomCannotBeBookedException
+
+            data = {
+                "room_id": booking.room_id,
+                "user_id": user_id,
+                "date_from": booking.date_from,
+                "date_to": booking.date_to,
+                "price": room.price,
+            }
+            query = insert(Bookings).values(**data).returning(Bookings)
+            result = await session.execute(query)
+            created_booking = result.scalar_one()
+            await RoomsService.reserve(
+                session, booking.room_id, booking.date_from, booking.date_to
+            )
+
+        return SBookingsRead.model_validate(created_booking)
+
+    @classmethod
+    async def add_bookings(
+        cls,
+        user_id: int,
+        bookings: list[SBookingsCreate],
+        session: AsyncSession | None = None,
+    ) -> list[SBookingsRead]:
+        """Book several rooms in one transaction, all or nothing."""
+        if any(booking.date_from >= booking.date_to for booking in bookings):
+            raise InvalidBookingPeriodException
+
+        room_ids = {booking.room_id for booking in bookings}
+        stays = [(b.room_id, b.date_from, b.date_to) for b in bookings]
+        async with session_scope(session) as session:
+            rooms = await RoomsService.lock_rooms(session, *room_ids)
+            if len(rooms) < len(room_ids):
+                raise RoomNotFoundException
+            # one query for every requested night, bookings of the same room
+            # in this batch count against each other
+            if await RoomsService.find_overbooked(session, stays):
+                raise RoomCannotBeBookedException
+
+            data = [
+                {
+                    "room_id": booking.room_id,
+                    "user_id": user_id,
+                    "date_from": booking.date_from,
+                    "date_to": booking.date_to,
+                    "price": rooms[booking.room_id].price,
+                }
+                for booking in bookings
+            ]
+            query = insert(Bookings).returning(Bookings, sort_by_parameter_order=True)
+            result = await session.execute(query, data)
+            created_bookings = result.scalars().all()
+            await RoomsService.reserve_many(session, stays)
+
+        return [SBookingsRead.model_validate(booking) for booking in created_bookings]
+
+    @classmethod
+    async def update_one(cls, instance, session: AsyncSession | None = None, **data):
+        async with session_scope(session) as session:
+            # lock order is booking, then rooms, then inventory in every path
             query = (
                 select(Bookings)
-                .where(Bookings.room_id == booking.room_id)
-                .where(Bookings.date_from <= booking.date_to)
-                .where(Bookings.date_to >= booking.date_from)
+                .where(Bookings.id == instance.id)
+                .with_for_update()
+                .execution_options(populate_existing=True)
+            )
+            result = await session.execute(query)
+            current = result.scalar_one_or_none()
+            if not current:
+                raise BookingNotFoundException
+
+            room_id = data.get("room_id", current.room_id)
+            date_from = data.get("date_from", current.date_from)
+            date_to = data.get("date_to", current.date_to)
+            if date_from >= date_to:
+                raise InvalidBookingPeriodException
+
+            rooms = await RoomsService.lock_rooms(session, current.room_id, room_id)
+            if room_id not in rooms:
+                raise RoomNotFoundException
+
+            # free the old nights first so the booking does not conflict with itself
+            await RoomsService.release(
+                session, current.room_id, current.date_from, current.date_to
             )
-            resp = await session.execute(query)
-            existing = resp.scalar_one_or_none()
-            if existing:
+            rooms_left = await RoomsService.get_rooms_left(
+                session, room_id, date_from, date_to
+            )
+            if rooms_left < 1:
                 raise RoomCannotBeBookedException
 
-        created_booking = await BookingsService.add_one(**data)
-        return SBookingsRead.model_validate(created_booking)
+            query = (
+                update(Bookings)
+                .where(Bookings.id == instance.id)
+                .values(**data)
+                .returning(Bookings)
+            )
+            result = await session.execute(query)
+            updated = result.scalar_one()
+            await RoomsService.reserve(session, room_id, date_from, date_to)
+            return updated
+
+    @classmethod
+    async def delete_one(cls, instance, session: AsyncSession | None = None):
+        async with session_scope(session) as session:
+            query = (
+                delete(Bookings).where(Bookings.id == instance.id).returning(Bookings)
+            )
+            result = await session.execute(query)
+            deleted = result.scalar_one_or_none()
+            if deleted:
+                await RoomsService.lock_rooms(session, deleted.room_id)
+                await RoomsService.release(
+                    session, deleted.room_id, deleted.date_from, deleted.date_to
+                )
+            return True
+
+    @classmethod
+    def reconcile_inventory(
+        cls,
+        session: Session,
+        date_from: date,
+        date_to: date,
+        after_id: int = 0,
+        limit: int = 500,
+    ) -> tuple[int | None, int]:
+        """Recount ``room_inventory`` nights ``date_from`` .. ``date_to - 1`` (sync).
+
+        Bookings changed outside the services, e.g. in the admin, leave the
+        inventory stale. Handles up to ``limit`` rooms after ``after_id`` and
+        returns the last room id (None when done) and the number of nights fixed.
+        The rooms are locked like a booking would, so no booking of them runs
+        while their nights are recounted.
+        """
+        query = (
+            select(Rooms.id)
+            .where(Rooms.id > after_id)
+            .order_by(Rooms.id)
+            .limit(limit)
+            .with_for_update(key_share=True)
+        )
+        room_ids = session.scalars(query).all()
+        if not room_ids:
+            return None, 0
+
+        days = select(
+            func.generate_series(
+                date_from, date_to - timedelta(days=1), text("interval '1 day'")
+            )
+            .cast(Date)
+            .label("day")
+        ).subquery()
+        expected = (
+            select(Bookings.room_id, days.c.day, func.count().label("booked"))
+            .join(
+                days,
+                and_(Bookings.date_from <= days.c.day, Bookings.date_to > days.c.day),
+            )
+            .where(
+                Bookings.room_id.in_(room_ids),
+                cls.overlaps_expr(date_from, date_to),
+            )
+            .group_by(Bookings.room_id, days.c.day)
+        )
+
+        expected_nights = expected.subquery("expected")
+        # nights no booking occupies anymore
+        freed = (
+            update(RoomInventory)
+            .where(
+                RoomInventory.room_id.in_(room_ids),
+                RoomInventory.day >= date_from,
+                RoomInventory.day < date_to,
+                RoomInventory.booked != 0,
+                ~exists().where(
+                    expected_nights.c.room_id == RoomInventory.room_id,
+                    expected_nights.c.day == RoomInventory.day,
+                ),
+            )
+            .values(booked=0)
+        )
+        fixed = session.execute(
+            freed.execution_options(preserve_rowcount=True)
+        ).rowcount
+
+        upsert = pg_insert(RoomInventory).from_select(
+            ["room_id", "day", "booked"], expected
+        )
+        upsert = upsert.on_conflict_do_update(
+            index_elements=[RoomInventory.room_id, RoomInventory.day],
+            set_={"booked": upsert.excluded.booked},
+            where=RoomInventory.booked != upsert.excluded.booked,
+        )
+        fixed += session.execute(
+            upsert.execution_options(preserve_rowcount=True)
+        ).rowcount
+        return room_ids[-1], fixed
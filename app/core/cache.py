@@ -0,0 +1,362 @@
+import asyncio
+import hashlib
+import inspect
+import logging
+import time
+import uuid
+from collections.abc import Iterable
+from contextlib import AsyncExitStack
+from functools import wraps
+from urllib.parse import quote, unquote
+
+from fastapi_cache import FastAPICache, JsonCoder
+from fastapi_cache.backends.redis import RedisBackend
+from sqlalchemy.ext.asyncio import AsyncSession
+from starlette.datastructures import MutableHeaders
+from starlette.requests import HTTPConnection, Request
+from starlette.responses import Response
+
+from app.core.database import read_session_maker
+from app.core.metrics import CACHE_REQUESTS
+
+logger = logging.getLogger(__name__)
+
+# tag sets outlive the entries they point to; stale members are harmless
+TAG_EXPIRE = 24 * 60 * 60
+
+# deletes every entry filed under the tag sets in KEYS, then the sets themselves
+INVALIDATE_TAGS_LUA = """
+for _, tag in ipairs(KEYS) do
+    local keys = redis.call('SMEMBERS', tag)
+    for i = 1, #keys, 500 do
+        redis.call('DEL', unpack(keys, i, math.min(i + 499, #keys)))
+    end
+    redis.call('DEL', tag)
+end
+return 0
+"""
+
+# deletes a lock only if it still holds our token, it may have expired and
+# been taken by another worker meanwhile
+RELEASE_LOCK_LUA = """
+if redis.call('GET', KEYS[1]) == ARGV[1] then
+    return redis.call('DEL', KEYS[1])
+end
+return 0
+"""
+LOCK_POLL_INTERVAL = 0.05  # seconds
+
+
+def _tag_value(value) -> str:
+    # tag values end up inside cache keys, keep ":" and "=" out of them
+    return quote(str(getattr(value, "id", value)), safe="")
+
+
+def _tag_key(kind: str, value) -> str:
+    return f"{FastAPICache.get_prefix()}:tag:{kind}:{_tag_value(value)}"
+
+
+def _tags_from_key(key: str) -> list[str]:
+    # keys look like "<prefix>:<namespace>:<kind>=<value>:...:<digest>"
+    tags = []
+    for part in key.split(":"):
+        if "=" in part:
+            kind, value = part.split("=", 1)
+            tags.append(_tag_key(kind, unquote(value)))
+    return tags
+
+
+class TaggedRedisBackend(RedisBackend):
+    """Redis backend that files every stored entry under the tags in its key.
+
+    Lookups are counted as hits or misses per cache namespace.
+    """
+
+    async def get_with_ttl(self, key: str) -> tuple[int, bytes | None]:
+        ttl, value = await super().get_with_ttl(key)
+        # keys look like "<prefix>:<namespace>:..."
+        namespace = key.removeprefix(f"{FastAPICache.get_prefix()}:").split(":")[0]
+        result = "miss" if value is None else "hit"
+        CACHE_REQUESTS.labels(namespace, result).inc()
+        return ttl, value
+
+    async def set(self, key: str, value: bytes, expire: int | None = None) -> None:
+        async with self.redis.pipeline(transaction=False) as pipe:
+            pipe.set(key, value, ex=expire)
+            for tag in _tags_from_key(key):
+                pipe.sadd(tag, key)
+                pipe.expire(tag, TAG_EXPIRE)
+            await pipe.execute()
+
+
+def tagged_key_builder(**tags: str):
+    """Key builder for ``@cache`` that tags entries with endpoint arguments.
+
+    ``tags`` maps a tag kind to the endpoint argument holding its value, e.g.
+    ``tagged_key_builder(hotel="hotel_id")``. Objects such as the current user
+    are tagged by their ``id``. The rest of the key comes from the request path
+    and query string, so dependencies like the session do not affect it.
+    """
+
+    def key_builder(func, namespace="", *, request=None, response=None, args, kwargs):
+        tag_parts = []
+        for kind, param in tags.items():
+            tag_parts.append(f"{kind}={_tag_value(kwargs[param])}")
+
+        if request is not None:
+            query = sorted(request.query_params.multi_items())
+            raw = f"{func.__module__}:{func.__name__}:{request.url.path}:{query}"
+        else:
+            raw = f"{func.__module__}:{func.__name__}:{args}:{kwargs}"
+        digest = hashlib.md5(raw.encode()).hexdigest()  # noqa: S324
+        return ":".join([namespace, *tag_parts, digest])
+
+    return key_builder
+
+
+async def invalidate_cache(**tags) -> None:
+    """Drop cached entries filed under any of the given tags.
+
+    Each keyword is a tag kind and its value a single id or an iterable of ids,
+    e.g. ``invalidate_cache(user=user.id, hotel=[old_hotel_id, new_hotel_id])``.
+    """
+    tag_keys = set()
+    for kind, values in tags.items():
+        if not isinstance(values, Iterable) or isinstance(values, str):
+            values = [values]
+        tag_keys.update(_tag_key(kind, value) for value in values if value is not None)
+    if not tag_keys:
+        return
+
+    redis = FastAPICache.get_backend().redis
+    await redis.eval(INVALIDATE_TAGS_LUA, len(tag_keys), *sorted(tag_keys))
+
+
+class PrivateCacheMiddleware:
+    """Keep responses to authenticated requests out of shared caches.
+
+    fastapi-cache sends ``Cache-Control: max-age=...`` for cached endpoints,
+    which lets a proxy or CDN serve one user's booking list to another user.
+    Responses to requests carrying the auth cookie are marked ``private`` and
+    vary on the cookie.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if (
+            scope["type"] != "http"
+            or "access_token" not in HTTPConnection(scope).cookies
+        ):
+            await self.app(scope, receive, send)
+            return
+
+        async def send_private(message):
+            if message["type"] == "http.response.start":
+                headers = MutableHeaders(scope=message)
+                cache_control = headers.get("cache-control")
+                if cache_control and "private" not in cache_control:
+                    headers["cache-control"] = f"private, {cache_control}"
+                    headers.add_vary_header("Cookie")
+            await send(message)
+
+        await self.app(scope, receive, send_private)
+
+
+# computations running in this process, by cache key
+_inflight: dict[str, asyncio.Future] = {}
+# background refreshes, referenced until done so they are not collected
+_refreshes: dict[str, asyncio.Task] = {}
+
+
+async def _acquire_lock(redis, key: str, timeout: float) -> str | None:
+    token = uuid.uuid4().hex
+    if await redis.set(f"{key}:lock", token, nx=True, px=int(timeout * 1000)):
+        return token
+    return None
+
+
+async def _release_lock(redis, key: str, token: str) -> None:
+    await redis.eval(RELEASE_LOCK_LUA, 1, f"{key}:lock", token)
+
+
+async def _read_entry(redis, key: str) -> tuple[float, bytes] | None:
+    """Stored body and the time until which it is fresh, None on a miss.
+
+    Reads Redis directly, the lookup is counted once per request by the caller.
+    """
+    value = await redis.get(key)
+    if value is None:
+        return None
+    try:
+        fresh_until, body = value.split(b"\n", 1)
+        return float(fresh_until), body
+    except ValueError:
+        # stored by @cache or cut short, recomputed like a miss
+        return None
+
+
+def coalesced_cache(
+    expire: int,
+    stale: int,
+    namespace: str,
+    key_builder,
+    lock_timeout: float = 10.0,
+):
+    """Cache a JSON endpoint, computing each entry at most once at a time.
+
+    Concurrent misses of one key share a single computation: requests of the
+    same process await the one in flight, other processes wait for the Redis
+    lock holder to store the entry. For ``stale`` seconds after an entry
+    expires it is still served while one request refreshes it in the
+    background, with its own database session. Entries are tagged like those
+    of ``@cache``, so ``invalidate_cache`` drops them.
+    """
+
+    def decorator(func):
+        signature = inspect.signature(func)
+        parameters = list(signature.parameters.values())
+        request_param = next(
+            (p.name for p in parameters if p.annotation is Request), None
+        )
+        if request_param is None:
+            parameters.append(
+                inspect.Parameter(
+                    "_cache_request", inspect.Parameter.KEYWORD_ONLY, annotation=Request
+                )
+            )
+
+        async def compute(kwargs) -> bytes:
+            result = await func(**kwargs)
+            if isinstance(result, Response):
+                return result.body
+            return JsonCoder.encode(result)
+
+        async def refresh(backend, key: str, kwargs, token: str) -> None:
+            try:
+                # the request and its sessions are gone, use fresh ones
+                async with AsyncExitStack() as stack:
+                    for name, value in kwargs.items():
+                        if isinstance(value, AsyncSession):
+                            kwargs[name] = await stack.enter_async_context(
+                                read_session_maker()
+                            )
+                    body = await compute(kwargs)
+                await store(backend, key, body)
+            except Exception:
+                logger.exception("refreshing cache entry %s failed", key)
+            finally:
+                await _release_lock(backend.redis, key, token)
+                _refreshes.pop(key, None)
+
+        async def store(backend, key: str, body: bytes) -> None:
+            fresh_until = f"{time.time() + expire:.3f}".encode()
+            await backend.set(key, fresh_until + b"\n" + body, expire + stale)
+
+        async def fill(backend, key: str, kwargs) -> bytes:
+            """Compute and store the entry, unless another process is on it."""
+            token = await _acquire_lock(backend.redis, key, lock_timeout)
+            if token is None:
+                deadline = time.monotonic() + lock_timeout
+                while time.monotonic() < deadline:
+                    await asyncio.sleep(LOCK_POLL_INTERVAL)
+                    entry = await _read_entry(backend.redis, key)
+                    if entry is not None:
+                        return entry[1]
+                # the holder died or is slow, stop waiting for it
+            try:
+                body = await compute(kwargs)
+                await store(backend, key, body)
+                return body
+            finally:
+                if token is not None:
+                    await _release_lock(backend.redis, key, token)
+
+        async def fill_once(backend, key: str, kwargs) -> bytes:
+            """Share one ``fill`` between the concurrent misses of this process."""
+            future = _inflight.get(key)
+            if future is not None:
+                try:
+                    return await asyncio.shield(future)
+                except asyncio.CancelledError:
+                    if not future.cancelled():
+                        raise
+                    # the request computing it went away, compute it here
+                    return await fill(backend, key, kwargs)
+
+            future = asyncio.get_running_loop().create_future()
+            # waiters re-raise a failure, mark it retrieved when there are none
+            future.add_done_callback(lambda f: f.cancelled() or f.exception())
+            _inflight[key] = future
+            try:
+                body = await fill(backend, key, kwargs)
+            except asyncio.CancelledError:
+                future.cancel()
+                raise
+            except Exception as error:
+                future.set_exception(error)
+                raise
+            else:
+                future.set_result(body)
+                return body
+            finally:
+                _inflight.pop(key, None)
+
+        @wraps(func)
+        async def wrapper(**kwargs):
+            if request_param is None:
+                request = kwargs.pop("_cache_request")
+            else:
+                request = kwargs[request_param]
+            backend = FastAPICache.get_backend()
+            key = key_builder(
+                func,
+                f"{FastAPICache.get_prefix()}:{namespace}",
+                request=request,
+                args=(),
+                kwargs=kwargs,
+            )
+
+            bypass = request.headers.get("Cache-Control") == "no-cache"
+            entry = None
+            if not bypass:
+                try:
+                    entry = await _read_entry(backend.redis, key)
+                except Exception:
+                    logger.warning("reading cache entry %s failed", key, exc_info=True)
+                    return Response(
+                        await compute(kwargs), media_type="application/json"
+                    )
+
+            if entry is None:
+                status, max_age = "MISS", expire
+            else:
+                fresh_until, body = entry
+                max_age = max(int(fresh_until - time.time()), 0)
+                status = "HIT" if fresh_until > time.time() else "STALE"
+            if not bypass:
+                CACHE_REQUESTS.labels(namespace, status.lower()).inc()
+
+            if status == "MISS":
+                body = await fill_once(backend, key, kwargs)
+            elif status == "STALE" and key not in _refreshes:
+                token = await _acquire_lock(backend.redis, key, lock_timeout)
+                if token is not None:
+                    _refreshes[key] = asyncio.create_task(
+                        refresh(backend, key, dict(kwargs), token)
+                    )
+
+            return Response(
+                body,
+                media_type="application/json",
+                headers={
+                    "Cache-Control": f"max-age={max_age}",
+                    FastAPICache.get_cache_status_header(): status,
+                },
+            )
+
+        wrapper.__signature__ = signature.replace(parameters=parameters)
+        return wrapper
+
+    return decorator
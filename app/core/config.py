@@ -12,24 +12,93 @@ class Settings(BaseSettings):
     DB_NAME: str
 
     DATABASE_URL: str | None = None
+    DATABASE_URL_SYNC: str | None = None
+
+    # read-only replica for GET endpoints, None reads from the primary
+    DB_REPLICA_HOST: str | None = None
+    DB_REPLICA_PORT: int | None = None  # None uses DB_PORT
+    DATABASE_REPLICA_URL: str | None = None
+
+    DB_POOL_SIZE: int = 5
+    DB_MAX_OVERFLOW: int = 10
+    DB_POOL_TIMEOUT: int = 30
+    DB_POOL_RECYCLE: int = 1800
+    DB_POOL_PRE_PING: bool = True
+    DB_STATEMENT_CACHE_SIZE: int = 100
+    DB_STATEMENT_TIMEOUT: int = 0  # milliseconds, 0 disables the timeout
+    SLOW_QUERY_THRESHOLD: int | None = 500  # milliseconds, None logs nothing
 
     SMTP_HOST: str
     SMTP_PORT: int
     SMTP_USER: str
     SMTP_PASS: str
+    SMTP_STARTTLS: bool = True
+    SMTP_TIMEOUT: int = 30  # seconds
 
     REDIS_HOST: str
     REDIS_PORT: int
 
+    BOOKING_BATCH_MAX: int = 50  # bookings per POST /bookings/batch
+    BULK_BATCH_SIZE: int = 5000  # rows per COPY during imports
+
+    STATS_ROLLUP_INTERVAL: int = 900  # seconds
+    STATS_LOOKBACK_DAYS: int = 7
+    STATS_LOOKAHEAD_DAYS: int = 90
+
+    INVENTORY_RECONCILE_INTERVAL: int = 3600  # seconds
+    INVENTORY_RECONCILE_DAYS: int = 365  # nights from today that are recounted
+
+    BOOKING_PARTITIONS_AHEAD: int = 12  # months of partitions kept ready
+    BOOKING_PARTITIONS_RETAINED: int | None = 24  # months, None never detaches
+    BOOKING_PARTITIONS_INTERVAL: int = 86400  # seconds
+    BOOKING_PARTITIONS_LOCK_TIMEOUT: int = 2000  # milliseconds
+
+    CELERY_RESULT_BACKEND: str | None = None  # None ignores task results
+    CELERY_RESULT_EXPIRES: int = 3600  # seconds
+    CELERY_PREFETCH_MULTIPLIER: int = 1
+    CELERY_CONCURRENCY: int | None = None  # None uses the number of CPUs
+    CELERY_ACKS_LATE: bool = True
+    CELERY_TASK_SOFT_TIME_LIMIT: int = 240  # seconds
+    CELERY_TASK_TIME_LIMIT: int = 300  # seconds
+    CELERY_METRICS_PORT: int | None = None  # None serves no worker metrics
+
+    EMAIL_RATE_LIMIT: str | None = None  # per worker, e.g. "100/m"
+    EMAIL_MAX_RETRIES: int = 5
+    EMAIL_RETRY_BACKOFF_MAX: int = 600  # seconds
+
+    OUTBOX_RELAY_INTERVAL: float = 2.0  # seconds
+    OUTBOX_BATCH_SIZE: int = 100
+
+    DEBUG: bool = False  # adds query stats headers to responses
+
     SECRET_KEY: str
     ALGORITHM: str
 
+    PASSWORD_HASH_SCHEME: str = "pbkdf2_sha256"
+    PASSWORD_HASH_ROUNDS: int | None = None  # None keeps the scheme default
+    PASSWORD_HASH_WORKERS: int = 4
+
+    AUTH_CACHE_SIZE: int = 10_000
+    AUTH_CACHE_TTL: int = 60  # seconds
+
     def model_post_init(self, __context):
         self.DATABASE_URL = (
             f"postgresql+asyncpg://{self.DB_USER}:"
             f"{self.DB_PASS}@{self.DB_HOST}:"
             f"{self.DB_PORT}/{self.DB_NAME}"
         )
+        # Celery workers are synchronous and use psycopg
+        self.DATABASE_URL_SYNC = (
+            f"postgresql+psycopg://{self.DB_USER}:"
+            f"{self.DB_PASS}@{self.DB_HOST}:"
+            f"{self.DB_PORT}/{self.DB_NAME}"
+        )
+        if self.DB_REPLICA_HOST:
+            self.DATABASE_REPLICA_URL = (
+                f"postgresql+asyncpg://{self.DB_USER}:"
+                f"{self.DB_PASS}@{self.DB_REPLICA_HOST}:"
+                f"{self.DB_REPLICA_PORT or self.DB_PORT}/{self.DB_NAME}"
+            )
 
 
 settings = Settings()
@@ -1,12 +1,135 @@
+import uuid
+from collections.abc import AsyncIterator
+from contextlib import asynccontextmanager
+
+from sqlalchemy import create_engine
 from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
 from sqlalchemy.orm import DeclarativeBase, sessionmaker
 
 from app.core.config import settings
+from app.core.metrics import instrument_pool
+from app.core.queries import instrument_queries
+
+
+def _create_engine(url: str):
+    connect_args = {
+        # prepared statements cached per connection by SQLAlchemy
+        "prepared_statement_cache_size": settings.DB_STATEMENT_CACHE_SIZE,
+    }
+    if settings.DB_STATEMENT_TIMEOUT:
+        # a startup parameter, pgbouncer needs it in ignore_startup_parameters
+        connect_args["server_settings"] = {
+            "statement_timeout": str(settings.DB_STATEMENT_TIMEOUT)
+        }
+    if settings.DB_STATEMENT_CACHE_SIZE == 0:
+        # behind pgbouncer in transaction mode a server connection is shared,
+        # so asyncpg must not cache statements either, and their names must
+        # not collide with those of another client
+        connect_args["statement_cache_size"] = 0
+        connect_args["prepared_statement_name_func"] = (
+            lambda: f"__asyncpg_{uuid.uuid4()}__"
+        )
+    return create_async_engine(
+        url,
+        pool_size=settings.DB_POOL_SIZE,
+        max_overflow=settings.DB_MAX_OVERFLOW,
+        pool_timeout=settings.DB_POOL_TIMEOUT,
+        pool_recycle=settings.DB_POOL_RECYCLE,
+        pool_pre_ping=settings.DB_POOL_PRE_PING,
+        connect_args=connect_args,
+    )
 
-engine = create_async_engine(settings.DATABASE_URL)
+
+engine = _create_engine(settings.DATABASE_URL)
 
 async_session_maker = sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
 
+# reads that can lag behind the primary by the replication delay; without a
+# replica this is the primary engine and both makers share one pool
+read_engine = (
+    _create_engine(settings.DATABASE_REPLICA_URL)
+    if settings.DATABASE_REPLICA_URL
+    else engine
+)
+
+instrument_pool(engine, "primary")
+instrument_queries(engine)
+if read_engine is not engine:
+    instrument_pool(read_engine, "replica")
+    instrument_queries(read_engine)
+
+read_session_maker = sessionmaker(
+    read_engine, class_=AsyncSession, expire_on_commit=False
+)
+
+# used by Celery tasks, connections are only opened on first use in a worker
+sync_engine = create_engine(
+    settings.DATABASE_URL_SYNC,
+    pool_size=settings.DB_POOL_SIZE,
+    max_overflow=settings.DB_MAX_OVERFLOW,
+    pool_timeout=settings.DB_POOL_TIMEOUT,
+    pool_recycle=settings.DB_POOL_RECYCLE,
+    pool_pre_ping=settings.DB_POOL_PRE_PING,
+    connect_args=(
+        {"options": f"-c statement_timeout={settings.DB_STATEMENT_TIMEOUT}"}
+        if settings.DB_STATEMENT_TIMEOUT
+        else {}
+    ),
+)
+
+instrument_pool(sync_engine, "sync")
+instrument_queries(sync_engine)
+
+sync_session_maker = sessionmaker(sync_engine, expire_on_commit=False)
+
 
 class Base(DeclarativeBase):
     pass
+
+
+async def get_session() -> AsyncIterator[AsyncSession]:
+    """Request-scoped unit of work.
+
+    Every service call made while handling a request shares this session, so
+    the request uses one pooled connection and one transaction. It is committed
+    after the endpoint returns and rolled back if the endpoint raises.
+    """
+    async with async_session_maker() as session:
+        try:
+            yield session
+            await session.commit()
+        except Exception:
+            await session.rollback()
+            raise
+
+
+async def get_read_session() -> AsyncIterator[AsyncSession]:
+    """Request-scoped session on the read replica, for GET endpoints.
+
+    Nothing is written through it, so it is only closed, never committed.
+    Endpoints that must see the user's own just-committed writes keep using
+    ``get_session``.
+    """
+    async with read_session_maker() as session:
+        yield session
+
+
+@asynccontextmanager
+async def session_scope(session: AsyncSession | None = None):
+    """Use the caller's session, or open one that commits on exit."""
+    if session is not None:
+        yield session
+        return
+    async with async_session_maker() as session:
+        yield session
+        await session.commit()
+
+
+@asynccontextmanager
+async def read_session_scope(session: AsyncSession | None = None):
+    """Use the caller's session, or open a read-only one on the replica."""
+    if session is not None:
+        yield session
+        return
+    async with read_session_maker() as session:
+        yield session
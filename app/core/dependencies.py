@@ -0,0 +1,14 @@
+from fastapi import Query
+
+DEFAULT_PAGE_SIZE = 50
+MAX_PAGE_SIZE = 100
+
+
+def get_pagination(
+    after_id: int | None = Query(
+        None, ge=0, description="Last id of the previous page"
+    ),
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+) -> dict:
+    """Keyset pagination parameters, passed straight to ``BaseService.find_all``."""
+    return {"after_id": after_id, "limit": limit}
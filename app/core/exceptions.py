@@ -39,3 +39,22 @@ BookingNotFoundException = HTTPException(
 RoomCannotBeBookedException = HTTPException(
     status_code=status.HTTP_409_CONFLICT, detail="Room cannot be booked"
 )
+
+InvalidBookingPeriodException = HTTPException(
+    status_code=status.HTTP_400_BAD_REQUEST,
+    detail="Check-out date must be after check-in date",
+)
+
+UnsupportedImportFormatException = HTTPException(
+    status_code=status.HTTP_415_UNSUPPORTED_MEDIA_TYPE,
+    detail="Send text/csv or application/x-ndjson",
+)
+
+ImportConflictException = HTTPException(
+    status_code=status.HTTP_409_CONFLICT,
+    detail="Imported rows conflict with existing data",
+)
+
+DatabaseUnavailableException = HTTPException(
+    status_code=status.HTTP_503_SERVICE_UNAVAILABLE, detail="Database unavailable"
+)
@@ -0,0 +1,135 @@
+import os
+import time
+
+from prometheus_client import (
+    CONTENT_TYPE_LATEST,
+    REGISTRY,
+    CollectorRegistry,
+    Counter,
+    Gauge,
+    Histogram,
+    generate_latest,
+    multiprocess,
+)
+from sqlalchemy import event
+from starlette.requests import Request
+from starlette.responses import Response
+
+from app.core.config import settings
+
+# gunicorn and Celery prefork run several processes; with this directory set
+# every process writes its samples there and a scrape sums them up
+MULTIPROC_DIR = os.environ.get("PROMETHEUS_MULTIPROC_DIR")
+
+HTTP_REQUESTS = Counter(
+    "http_requests_total",
+    "HTTP requests by route and status code.",
+    ["method", "route", "status"],
+)
+HTTP_REQUEST_DURATION = Histogram(
+    "http_request_duration_seconds",
+    "Time spent handling an HTTP request, body included.",
+    ["method", "route"],
+)
+CACHE_REQUESTS = Counter(
+    "cache_requests_total",
+    "Cache lookups by namespace, result is hit, miss or stale.",
+    ["namespace", "result"],
+)
+DB_POOL_CHECKED_OUT = Gauge(
+    "db_pool_checked_out",
+    "Connections currently borrowed from the pool.",
+    ["engine"],
+    multiprocess_mode="livesum",
+)
+DB_POOL_MAX = Gauge(
+    "db_pool_max_connections",
+    "Connections the pool may open, pool size plus overflow.",
+    ["engine"],
+    multiprocess_mode="livesum",
+)
+TASK_DURATION = Histogram(
+    "celery_task_duration_seconds",
+    "Run time of Celery tasks.",
+    ["task"],
+    buckets=(0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 120, 300),
+)
+TASKS = Counter(
+    "celery_tasks_total",
+    "Finished Celery task runs by final state.",
+    ["task", "state"],
+)
+TASK_FAILURES = Counter(
+    "celery_task_failures_total",
+    "Failed Celery task runs by exception type.",
+    ["task", "exception"],
+)
+
+
+def instrument_pool(engine, name: str) -> None:
+    """Track borrowed connections of a (sync or async) engine's pool."""
+    sync_engine = getattr(engine, "sync_engine", engine)
+    DB_POOL_MAX.labels(name).set(settings.DB_POOL_SIZE + settings.DB_MAX_OVERFLOW)
+    checked_out = DB_POOL_CHECKED_OUT.labels(name)
+
+    @event.listens_for(sync_engine, "checkout")
+    def on_checkout(*args) -> None:
+        checked_out.inc()
+
+    @event.listens_for(sync_engine, "checkin")
+    def on_checkin(*args) -> None:
+        checked_out.dec()
+
+
+def metrics_registry():
+    if MULTIPROC_DIR is None:
+        return REGISTRY
+    registry = CollectorRegistry()
+    multiprocess.MultiProcessCollector(registry)
+    return registry
+
+
+def mark_process_dead() -> None:
+    """Drop the live gauges of this process, call it when the process exits."""
+    if MULTIPROC_DIR is not None:
+        multiprocess.mark_process_dead(os.getpid())
+
+
+async def metrics_endpoint(request: Request) -> Response:
+    return Response(generate_latest(metrics_registry()), media_type=CONTENT_TYPE_LATEST)
+
+
+class MetricsMiddleware:
+    """Count HTTP requests and time them per route template.
+
+    The route is the path template, e.g. ``/hotels/{hotel_id}``, so ids do not
+    end up in label values. Requests no route matched are reported as
+    ``unmatched``.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        status = 500
+        started = time.perf_counter()
+
+        async def send_with_status(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            route = scope.get("route")
+            path = getattr(route, "path", "unmatched")
+            HTTP_REQUEST_DURATION.labels(scope["method"], path).observe(
+                time.perf_counter() - started
+            )
+            HTTP_REQUESTS.labels(scope["method"], path, status).inc()
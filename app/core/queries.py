@@ -0,0 +1,120 @@
+import logging
+import time
+from collections.abc import Iterator
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass
+
+from sqlalchemy import event
+from starlette.datastructures import MutableHeaders
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class QueryStats:
+    """Queries run while tracking, e.g. during one request."""
+
+    label: str = ""
+    count: int = 0
+    duration: float = 0.0  # seconds
+    parent: "QueryStats | None" = None
+
+
+_current_stats: ContextVar[QueryStats | None] = ContextVar("query_stats", default=None)
+
+
+@contextmanager
+def track_queries(label: str = "") -> Iterator[QueryStats]:
+    """Count the queries run in this context until the block exits.
+
+    Blocks nest, a query counts towards every enclosing block.
+    """
+    stats = QueryStats(label, parent=_current_stats.get())
+    token = _current_stats.set(stats)
+    try:
+        yield stats
+    finally:
+        _current_stats.reset(token)
+
+
+@contextmanager
+def assert_max_queries(limit: int, label: str = "") -> Iterator[QueryStats]:
+    """Fail when the block runs more than ``limit`` queries.
+
+    Catches N+1 patterns in tests, e.g.::
+
+        with assert_max_queries(3):
+            await client.get("/bookings")
+    """
+    with track_queries(label) as stats:
+        yield stats
+    assert stats.count <= limit, (  # noqa: S101
+        f"{stats.count} queries run, at most {limit} expected"
+    )
+
+
+def instrument_queries(engine) -> None:
+    """Time every statement of a (sync or async) engine.
+
+    Statements count towards the ``track_queries`` block they run in, and
+    those slower than ``SLOW_QUERY_THRESHOLD`` are logged with their parameters.
+    """
+    sync_engine = getattr(engine, "sync_engine", engine)
+
+    @event.listens_for(sync_engine, "before_cursor_execute")
+    def before_execute(conn, cursor, statement, parameters, context, executemany):
+        # on the statement's context, a statement that raises leaves nothing
+        # behind on the pooled connection
+        context.query_started = time.perf_counter()
+
+    @event.listens_for(sync_engine, "after_cursor_execute")
+    def after_execute(conn, cursor, statement, parameters, context, executemany):
+        elapsed = time.perf_counter() - context.query_started
+        stats = tracked = _current_stats.get()
+        while tracked is not None:
+            tracked.count += 1
+            tracked.duration += elapsed
+            tracked = tracked.parent
+
+        threshold = settings.SLOW_QUERY_THRESHOLD
+        if threshold is not None and elapsed * 1000 >= threshold:
+            logger.warning(
+                "slow query (%.1f ms) %s: %s parameters: %.1000r",
+                elapsed * 1000,
+                stats.label if stats else "-",
+                statement,
+                parameters,
+            )
+
+
+class QueryStatsMiddleware:
+    """Attribute queries to the request that runs them.
+
+    Slow-query log lines name the request. With ``DEBUG`` the response carries
+    the query count and total query time in ``X-DB-Queries`` and
+    ``Server-Timing`` headers; queries run while a body is streamed are missed.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        label = f"{scope['method']} {scope['path']}"
+        with track_queries(label) as stats:
+
+            async def send_with_stats(message):
+                if message["type"] == "http.response.start" and settings.DEBUG:
+                    headers = MutableHeaders(scope=message)
+                    duration = f"{stats.duration * 1000:.1f}"
+                    headers["X-DB-Queries"] = str(stats.count)
+                    headers.append("Server-Timing", f"db;dur={duration}")
+                await send(message)
+
+            await self.app(scope, receive, send_with_stats)
@@ -0,0 +1,45 @@
+from typing import Any
+
+from pydantic import TypeAdapter
+from starlette.responses import JSONResponse, Response
+
+
+class ModelResponse(JSONResponse):
+    """JSON response serialized straight to bytes by a pydantic ``TypeAdapter``.
+
+    Returning a response makes FastAPI skip its ``response_model`` pass, which
+    dumps already validated models to dicts, validates them again and encodes
+    the result with ``json``. ``content`` must hold instances of the adapter's
+    type, e.g. ``SRoomsPeriod`` models for ``TypeAdapter(list[SRoomsPeriod])``.
+    Adapters are built once, next to their schemas, e.g. ``ROOMS_PERIOD_LIST``.
+
+    FastAPI drops headers set on the endpoint's ``Response`` parameter when a
+    response is returned; pass it as ``response`` to keep them, e.g. the cache
+    headers of ``@cache``. Being a ``JSONResponse``, fastapi-cache stores its
+    body as is.
+    """
+
+    def __init__(
+        self,
+        content: Any,
+        adapter: TypeAdapter,
+        response: Response | None = None,
+        **kwargs,
+    ):
+        self.adapter = adapter
+        self.parent_response = response
+        super().__init__(content, **kwargs)
+
+    def render(self, content: Any) -> bytes:
+        return self.adapter.dump_json(content)
+
+    async def __call__(self, scope, receive, send) -> None:
+        if self.parent_response is not None:
+            # set after the endpoint returned, e.g. by a cache decorator
+            own = {name for name, _ in self.raw_headers}
+            self.raw_headers.extend(
+                (name, value)
+                for name, value in self.parent_response.raw_headers
+                if name not in own
+            )
+        await super().__call__(scope, receive, send)
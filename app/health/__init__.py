@@ -0,0 +1 @@
+"""Health package."""
@@ -0,0 +1,34 @@
+from fastapi import APIRouter
+from sqlalchemy import text
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.ext.asyncio import AsyncEngine
+
+from app.core.database import engine, read_engine
+from app.core.exceptions import DatabaseUnavailableException
+
+router = APIRouter(prefix="/health", tags=["Health"])
+
+
+async def check_engine(db_engine: AsyncEngine) -> dict:
+    pool = db_engine.pool
+    # read the counters before borrowing a connection for the ping
+    stats = {
+        "size": pool.size(),
+        "checked_in": pool.checkedin(),
+        "checked_out": pool.checkedout(),
+        "overflow": pool.overflow(),
+    }
+    try:
+        async with db_engine.connect() as conn:
+            await conn.execute(text("SELECT 1"))
+    except (SQLAlchemyError, OSError):
+        raise DatabaseUnavailableException
+    return stats
+
+
+@router.get("/db")
+async def db_health():
+    health = {"status": "ok", "pool": await check_engine(engine)}
+    if read_engine is not engine:
+        health["replica_pool"] = await check_engine(read_engine)
+    return health
@@ -1,4 +1,4 @@
-from sqlalchemy import JSON, Column, Integer, String
+from sqlalchemy import JSON, Column, Date, DateTime, ForeignKey, Integer, String, func
 
 from app.core.database import Base
 
@@ -13,3 +13,22 @@ class Hotels(Base):
     services = Column(JSON)
     rooms_quantity = Column(Integer, nullable=False)
     image_id = Column(String)
+
+
+class HotelStats(Base):
+    """Daily occupancy and revenue of a hotel, rolled up by a Celery beat job.
+
+    ``rooms_booked`` counts units occupied on the night of ``day``; check-ins,
+    nights sold and revenue belong to the bookings starting on ``day``.
+    """
+
+    __tablename__ = "hotel_stats"
+
+    hotel_id = Column(ForeignKey("hotels.id", ondelete="CASCADE"), primary_key=True)
+    day = Column(Date, primary_key=True, index=True)
+    rooms_total = Column(Integer, nullable=False)
+    rooms_booked = Column(Integer, nullable=False)
+    check_ins = Column(Integer, nullable=False)
+    nights_sold = Column(Integer, nullable=False)
+    revenue = Column(Integer, nullable=False)
+    updated_at = Column(DateTime(timezone=True), server_default=func.now())
@@ -1,42 +1,143 @@
-from fastapi import APIRouter, status
+from datetime import date
 
+from fastapi import APIRouter, Depends, Request, status
+from fastapi.responses import StreamingResponse
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.bulk import read_import_batches
+from app.core.cache import coalesced_cache, invalidate_cache, tagged_key_builder
+from app.core.database import get_read_session, get_session
+from app.core.dependencies import get_pagination
 from app.core.exceptions import HotelNotFoundException
-from app.hotels.schemas import SHotels
-from app.hotels.service import HotelsService
+from app.core.responses import ModelResponse
+from app.hotels.schemas import (
+    HOTEL_STATS_LIST,
+    HOTELS_LIST,
+    HOTELS_SEARCH_LIST,
+    SHotels,
+    SHotelsSearch,
+    SHotelStats,
+)
+from app.hotels.service import HotelsService, HotelStatsService
+from app.users.dependencies import get_admin_user
 
 router = APIRouter(prefix="/hotels", tags=["Hotels"])
 
 
 @router.get("/", response_model=list[SHotels])
-async def get_hotels():
-    return await HotelsService.find_all()
+async def get_hotels(
+    city: str | None = None,
+    page: dict = Depends(get_pagination),
+    session: AsyncSession = Depends(get_read_session),
+):
+    filters = {"city": city} if city is not None else {}
+    hotels = await HotelsService.find_all(session=session, **page, **filters)
+    return ModelResponse(
+        HOTELS_LIST.validate_python(hotels, from_attributes=True), HOTELS_LIST
+    )
+
+
+@router.get("/search", response_model=list[SHotelsSearch])
+@coalesced_cache(
+    expire=60,
+    stale=300,
+    namespace="hotels",
+    key_builder=tagged_key_builder(city="city"),
+)
+async def search_hotels(
+    city: str,
+    date_from: date,
+    date_to: date,
+    session: AsyncSession = Depends(get_read_session),
+):
+    hotels = await HotelsService.search_available(
+        city, date_from, date_to, session=session
+    )
+    return ModelResponse(hotels, HOTELS_SEARCH_LIST)
+
+
+@router.get("/export")
+async def export_hotels():
+    """All hotels as CSV, streamed with COPY."""
+    return StreamingResponse(
+        HotelsService.copy_out(),
+        media_type="text/csv",
+        headers={"Content-Disposition": 'attachment; filename="hotels.csv"'},
+    )
+
+
+@router.post("/import")
+async def import_hotels(request: Request, session: AsyncSession = Depends(get_session)):
+    """Bulk load hotels from a CSV or NDJSON body, all or nothing."""
+    imported = 0
+    cities = set()
+    async for batch in read_import_batches(request, SHotels, json_fields=("services",)):
+        imported += await HotelsService.copy_many(batch, session=session)
+        cities.update(hotel["city"] for hotel in batch)
+    await session.commit()
+    await invalidate_cache(city=cities)
+    return {"imported": imported}
 
 
 @router.get("/{hotel_id}", response_model=SHotels)
-async def get_hotel(hotel_id: int):
-    hotel = await HotelsService.find_by_id(hotel_id)
+async def get_hotel(hotel_id: int, session: AsyncSession = Depends(get_read_session)):
+    hotel = await HotelsService.find_by_id(hotel_id, session=session)
     if not hotel:
         raise HotelNotFoundException
     return hotel
 
 
+@router.get(
+    "/{hotel_id}/stats",
+    response_model=list[SHotelStats],
+    dependencies=[Depends(get_admin_user)],
+)
+async def get_hotel_stats(
+    hotel_id: int,
+    date_from: date,
+    date_to: date,
+    session: AsyncSession = Depends(get_read_session),
+):
+    """Daily occupancy and revenue, as of the last stats rollup.
+
+    For users signed in to the admin dashboard.
+    """
+    stats = await HotelStatsService.find_for_hotel(
+        hotel_id, date_from, date_to, session=session
+    )
+    return ModelResponse(stats, HOTEL_STATS_LIST)
+
+
 @router.post("/", response_model=SHotels)
-async def create_one(hotel: SHotels):
-    return await HotelsService.add_one(**hotel.model_dump())
+async def create_one(hotel: SHotels, session: AsyncSession = Depends(get_session)):
+    created_hotel = await HotelsService.add_one(session=session, **hotel.model_dump())
+    await session.commit()
+    await invalidate_cache(city=created_hotel.city)
+    return created_hotel
 
 
 @router.put("/{hotel_id}", response_model=SHotels)
-async def update_hotel(hotel_id: int, hotel: SHotels):
-    existing_hotel = await HotelsService.find_by_id(hotel_id)
+async def update_hotel(
+    hotel_id: int, hotel: SHotels, session: AsyncSession = Depends(get_session)
+):
+    existing_hotel = await HotelsService.find_by_id(hotel_id, session=session)
     if not existing_hotel:
         raise HotelNotFoundException
 
-    return await HotelsService.update_one(existing_hotel, **hotel.model_dump())
+    old_city = existing_hotel.city
+    updated_hotel = await HotelsService.update_one(
+        existing_hotel, session=session, **hotel.model_dump()
+    )
+    await session.commit()
+    await invalidate_cache(city=[old_city, updated_hotel.city])
+    return updated_hotel
 
 
 @router.delete("/{hotel_id}", status_code=status.HTTP_204_NO_CONTENT)
-async def delete_one(hotel_id: int):
-    existing_hotel = await HotelsService.find_by_id(hotel_id)
+async def delete_one(hotel_id: int, session: AsyncSession = Depends(get_session)):
+    existing_hotel = await HotelsService.find_by_id(hotel_id, session=session)
     if not existing_hotel:
         raise HotelNotFoundException
-    return await HotelsService.delete_one(existing_hotel)
+    await HotelsService.delete_one(existing_hotel, session=session)
+    await session.commit()
+    await invalidate_cache(city=existing_hotel.city, hotel=hotel_id)
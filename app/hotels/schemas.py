@@ -1,4 +1,6 @@
-from pydantic import BaseModel, ConfigDict
+from datetime import date
+
+from pydantic import BaseModel, ConfigDict, TypeAdapter
 from sqlalchemy import Any
 
 
@@ -12,3 +14,24 @@ class SHotels(BaseModel):
     image_id: str
 
     model_config = ConfigDict(from_attributes=True)
+
+
+class SHotelsSearch(SHotels):
+    rooms_left: int
+    min_price: int
+
+
+class SHotelStats(BaseModel):
+    day: date
+    rooms_total: int
+    rooms_booked: int
+    check_ins: int
+    nights_sold: int
+    revenue: int
+
+    model_config = ConfigDict(from_attributes=True)
+
+
+HOTELS_LIST = TypeAdapter(list[SHotels])
+HOTELS_SEARCH_LIST = TypeAdapter(list[SHotelsSearch])
+HOTEL_STATS_LIST = TypeAdapter(list[SHotelStats])
@@ -1,6 +1,193 @@
-from app.hotels.models import Hotels
+from datetime import date
+
+from sqlalchemy import delete, func, literal, select, union_all
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+
+from app.bookings.models import Bookings
+from app.core.database import read_session_scope
+from app.core.exceptions import InvalidBookingPeriodException
+from app.hotels.models import Hotels, HotelStats
+from app.hotels.schemas import (
+    HOTEL_STATS_LIST,
+    HOTELS_SEARCH_LIST,
+    SHotelsSearch,
+    SHotelStats,
+)
+from app.rooms.models import RoomInventory, Rooms
+from app.rooms.service import RoomsService
 from app.services.base import BaseService
 
 
 class HotelsService(BaseService):
     model = Hotels
+
+    @classmethod
+    async def search_available(
+        cls,
+        city: str,
+        date_from: date,
+        date_to: date,
+        session: AsyncSession | None = None,
+    ) -> list[SHotelsSearch]:
+        """Hotels of a city with rooms free for the whole period, in one query."""
+        if date_from >= date_to:
+            raise InvalidBookingPeriodException
+
+        async with read_session_scope(session) as session:
+            rooms = (
+                select(
+                    Rooms.hotel_id,
+                    Rooms.price,
+                    RoomsService.rooms_left_expr(date_from, date_to).label(
+                        "rooms_left"
+                    ),
+                )
+                .join(Hotels, Hotels.id == Rooms.hotel_id)
+                .where(Hotels.city == city)
+                .subquery()
+            )
+            query = (
+                select(
+                    Hotels.id,
+                    Hotels.name,
+                    Hotels.city,
+                    Hotels.location,
+                    Hotels.services,
+                    Hotels.rooms_quantity,
+                    Hotels.image_id,
+                    func.sum(rooms.c.rooms_left).label("rooms_left"),
+                    func.min(rooms.c.price).label("min_price"),
+                )
+                .join(rooms, rooms.c.hotel_id == Hotels.id)
+                .where(rooms.c.rooms_left > 0)
+                .group_by(Hotels.id)
+                .order_by(Hotels.id)
+            )
+            result = await session.execute(query)
+            return HOTELS_SEARCH_LIST.validate_python(result.mappings().all())
+
+    @classmethod
+    async def find_by_room_ids(
+        cls, room_ids, session: AsyncSession | None = None
+    ) -> list[Hotels]:
+        return await cls.find_all(
+            Hotels.id.in_(select(Rooms.hotel_id).where(Rooms.id.in_(room_ids))),
+            session=session,
+        )
+
+
+class HotelStatsService(BaseService):
+    model = HotelStats
+
+    @classmethod
+    async def find_for_hotel(
+        cls,
+        hotel_id: int,
+        date_from: date,
+        date_to: date,
+        session: AsyncSession | None = None,
+    ) -> list[SHotelStats]:
+        async with read_session_scope(session) as session:
+            query = (
+                select(HotelStats)
+                .where(
+                    HotelStats.hotel_id == hotel_id,
+                    HotelStats.day.between(date_from, date_to),
+                )
+                .order_by(HotelStats.day)
+            )
+            result = await session.execute(query)
+            return HOTEL_STATS_LIST.validate_python(
+                result.scalars().all(), from_attributes=True
+            )
+
+    @classmethod
+    def rollup(cls, session: Session, date_from: date, date_to: date) -> int:
+        """Recompute the stats of days ``date_from`` .. ``date_to`` (sync).
+
+        Only days with bookings get a row. Rows of the window are replaced, so
+        cancelled bookings drop out of the stats on the next run.
+        """
+        occupancy = (
+            select(
+                Rooms.hotel_id,
+                RoomInventory.day,
+                RoomInventory.booked.label("rooms_booked"),
+                literal(0).label("check_ins"),
+                literal(0).label("nights_sold"),
+                literal(0).label("revenue"),
+            )
+            .join(Rooms, Rooms.id == RoomInventory.room_id)
+            .where(
+                RoomInventory.day.between(date_from, date_to),
+                RoomInventory.booked > 0,
+            )
+        )
+        sales = (
+            select(
+                Rooms.hotel_id,
+                Bookings.date_from.label("day"),
+                literal(0).label("rooms_booked"),
+                literal(1).label("check_ins"),
+                Bookings.total_days.label("nights_sold"),
+                Bookings.total_cost.label("revenue"),
+            )
+            .join(Rooms, Rooms.id == Bookings.room_id)
+            .where(
+                Bookings.date_from.between(date_from, date_to),
+                # implied by the check-in, lets the planner skip the partitions
+                # of stays that ended before the window
+                Bookings.date_to > date_from,
+            )
+        )
+        activity = union_all(occupancy, sales).subquery()
+        capacity = (
+            select(Rooms.hotel_id, func.sum(Rooms.quantity).label("rooms_total"))
+            .group_by(Rooms.hotel_id)
+            .subquery()
+        )
+        rows = (
+            select(
+                activity.c.hotel_id,
+                activity.c.day,
+                capacity.c.rooms_total,
+                func.sum(activity.c.rooms_booked),
+                func.sum(activity.c.check_ins),
+                func.sum(activity.c.nights_sold),
+                func.sum(activity.c.revenue),
+            )
+            .join(capacity, capacity.c.hotel_id == activity.c.hotel_id)
+            .group_by(activity.c.hotel_id, activity.c.day, capacity.c.rooms_total)
+        )
+
+        session.execute(
+            delete(HotelStats).where(HotelStats.day.between(date_from, date_to))
+        )
+        query = insert(HotelStats).from_select(
+            [
+                "hotel_id",
+                "day",
+                "rooms_total",
+                "rooms_booked",
+                "check_ins",
+                "nights_sold",
+                "revenue",
+            ],
+            rows,
+        )
+        # a concurrent rollup of the same window may have inserted first
+        query = query.on_conflict_do_update(
+            index_elements=[HotelStats.hotel_id, HotelStats.day],
+            set_={
+                "rooms_total": query.excluded.rooms_total,
+                "rooms_booked": query.excluded.rooms_booked,
+                "check_ins": query.excluded.check_ins,
+                "nights_sold": query.excluded.nights_sold,
+                "revenue": query.excluded.revenue,
+                "updated_at": func.now(),
+            },
+        )
+        result = session.execute(query.execution_options(preserve_rowcount=True))
+        return result.rowcount
@@ -3,7 +3,6 @@ from contextlib import asynccontextmanager
 
 from fastapi import FastAPI
 from fastapi_cache import FastAPICache
-from fastapi_cache.backends.redis import RedisBackend
 from redis import asyncio as aioredis
 from sqladmin import Admin
 from starlette.middleware.sessions import SessionMiddleware
@@ -11,8 +10,12 @@ from starlette.middleware.sessions import SessionMiddleware
 from app.admin.auth import authentication_backend
 from app.admin.views import BookingAdmin, HotelAdmin, RoomAdmin, UserAdmin
 from app.bookings.router import router as bookings_router
+from app.core.cache import PrivateCacheMiddleware, TaggedRedisBackend
 from app.core.config import settings
 from app.core.database import engine
+from app.core.metrics import MetricsMiddleware, mark_process_dead, metrics_endpoint
+from app.core.queries import QueryStatsMiddleware
+from app.health.router import router as health_router
 from app.hotels.router import router as hotels_router
 from app.rooms.router import router as rooms_router
 from app.users.router import router as users_router
@@ -21,8 +24,9 @@ from app.users.router import router as users_router
 @asynccontextmanager
 async def lifespan(app: FastAPI) -> AsyncIterator[None]:
     redis = aioredis.from_url(f"redis://{settings.REDIS_HOST}:{settings.REDIS_PORT}")
-    FastAPICache.init(RedisBackend(redis), prefix="cache")
+    FastAPICache.init(TaggedRedisBackend(redis), prefix="cache")
     yield
+    mark_process_dead()
 
 
 app = FastAPI(lifespan=lifespan)
@@ -32,10 +36,16 @@ app.add_middleware(
     secret_key=settings.SECRET_KEY,
     max_age=3600,
 )
+app.add_middleware(PrivateCacheMiddleware)
+app.add_middleware(QueryStatsMiddleware)
+# outermost, so the timing covers the other middleware as well
+app.add_middleware(MetricsMiddleware)
 app.include_router(users_router)
 app.include_router(bookings_router)
 app.include_router(hotels_router)
 app.include_router(rooms_router)
+app.include_router(health_router)
+app.add_route("/metrics", metrics_endpoint, include_in_schema=False)
 
 
 @app.get("/")
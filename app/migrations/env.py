@@ -9,9 +9,12 @@ from sqlalchemy import engine_from_config, pool
 sys.path.insert(0, dirname(dirname(abspath(__file__))))
 
 from app.bookings.models import Bookings  # noqa: F401
+from app.bookings.partitions import DEFAULT_PARTITION, PARTITION_NAME
 from app.core.config import settings
 from app.core.database import Base
-from app.hotels.models import Hotels, Rooms  # noqa: F401
+from app.hotels.models import Hotels, HotelStats  # noqa: F401
+from app.outbox.models import Outbox  # noqa: F401
+from app.rooms.models import RoomInventory, Rooms  # noqa: F401
 from app.users.models import Users  # noqa: F401
 
 # this is the Alembic Config object, which provides
@@ -36,6 +39,13 @@ target_metadata = Base.metadata
 # ... etc.
 
 
+def include_name(name, type_, parent_names) -> bool:
+    # booking partitions are created at runtime by app/bookings/partitions.py
+    if type_ == "table":
+        return not PARTITION_NAME.match(name) and name != DEFAULT_PARTITION
+    return True
+
+
 def run_migrations_offline() -> None:
     """Run migrations in 'offline' mode.
 
@@ -52,6 +62,7 @@ def run_migrations_offline() -> None:
     context.configure(
         url=url,
         target_metadata=target_metadata,
+        include_name=include_name,
         literal_binds=True,
         dialect_opts={"paramstyle": "named"},
     )
@@ -74,7 +85,11 @@ def run_migrations_online() -> None:
     )
 
     with connectable.connect() as connection:
-        context.configure(connection=connection, target_metadata=target_metadata)
+        context.configure(
+            connection=connection,
+            target_metadata=target_metadata,
+            include_name=include_name,
+        )
 
         with context.begin_transaction():
             context.run_migrations()
@@ -0,0 +1,53 @@
+"""Add hotel stats
+
+Revision ID: 8c4e2f71d5b3
+Revises: 3b1d7c5a9e42
+Create Date: 2026-10-18 12:26:43.918302
+
+"""
+
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "8c4e2f71d5b3"
+down_revision: Union[str, Sequence[str], None] = "3b1d7c5a9e42"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table(
+        "hotel_stats",
+        sa.Column("hotel_id", sa.Integer(), nullable=False),
+        sa.Column("day", sa.Date(), nullable=False),
+        sa.Column("rooms_total", sa.Integer(), nullable=False),
+        sa.Column("rooms_booked", sa.Integer(), nullable=False),
+        sa.Column("check_ins", sa.Integer(), nullable=False),
+        sa.Column("nights_sold", sa.Integer(), nullable=False),
+        sa.Column("revenue", sa.Integer(), nullable=False),
+        sa.Column(
+            "updated_at",
+            sa.DateTime(timezone=True),
+            server_default=sa.text("now()"),
+            nullable=True,
+        ),
+        sa.ForeignKeyConstraint(["hotel_id"], ["hotels.id"], ondelete="CASCADE"),
+        sa.PrimaryKeyConstraint("hotel_id", "day"),
+    )
+    # the rollup replaces whole windows of days across all hotels
+    op.create_index(op.f("ix_hotel_stats_day"), "hotel_stats", ["day"], unique=False)
+    # the rollup reads the bookings checking in during the window
+    op.create_index(
+        op.f("ix_bookings_date_from"), "bookings", ["date_from"], unique=False
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index(op.f("ix_bookings_date_from"), table_name="bookings")
+    op.drop_index(op.f("ix_hotel_stats_day"), table_name="hotel_stats")
+    op.drop_table("hotel_stats")
@@ -0,0 +1,36 @@
+"""Add bookings stay GiST index
+
+Revision ID: b7e93d0c4a18
+Revises: 8c4e2f71d5b3
+Create Date: 2026-10-18 13:41:05.672290
+
+"""
+
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "b7e93d0c4a18"
+down_revision: Union[str, Sequence[str], None] = "8c4e2f71d5b3"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # GiST operator class for the integer room_id next to the date range
+    op.execute("CREATE EXTENSION IF NOT EXISTS btree_gist")
+    op.create_index(
+        "ix_bookings_room_id_stay",
+        "bookings",
+        ["room_id", sa.text("daterange(date_from, date_to)")],
+        unique=False,
+        postgresql_using="gist",
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index("ix_bookings_room_id_stay", table_name="bookings")
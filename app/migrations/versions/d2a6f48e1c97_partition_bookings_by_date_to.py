@@ -0,0 +1,143 @@
+"""Partition bookings by date_to
+
+Revision ID: d2a6f48e1c97
+Revises: b7e93d0c4a18
+Create Date: 2026-10-18 14:58:31.140726
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "d2a6f48e1c97"
+down_revision: Union[str, Sequence[str], None] = "b7e93d0c4a18"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# generated columns are recomputed when the rows are copied
+STORED_COLUMNS = "id, room_id, user_id, date_from, date_to, price"
+
+
+def create_indexes() -> None:
+    op.create_index(op.f("ix_bookings_id"), "bookings", ["id"], unique=False)
+    op.create_index(op.f("ix_bookings_room_id"), "bookings", ["room_id"], unique=False)
+    op.create_index(op.f("ix_bookings_user_id"), "bookings", ["user_id"], unique=False)
+    op.create_index(
+        op.f("ix_bookings_date_from"), "bookings", ["date_from"], unique=False
+    )
+    op.execute(
+        "CREATE INDEX ix_bookings_room_id_stay ON bookings "
+        "USING gist (room_id, daterange(date_from, date_to))"
+    )
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.execute("ALTER TABLE bookings RENAME TO bookings_old")
+    op.execute(
+        "ALTER TABLE bookings_old RENAME CONSTRAINT bookings_pkey TO bookings_old_pkey"
+    )
+    # the partition key has to be part of the primary key
+    op.execute(
+        """
+        CREATE TABLE bookings (
+            id integer NOT NULL DEFAULT nextval('bookings_id_seq'::regclass),
+            room_id integer NOT NULL REFERENCES rooms (id),
+            user_id integer NOT NULL REFERENCES users (id),
+            date_from date NOT NULL,
+            date_to date NOT NULL,
+            price integer NOT NULL,
+            total_days integer GENERATED ALWAYS AS (date_to - date_from) STORED,
+            total_cost integer
+                GENERATED ALWAYS AS ((date_to - date_from) * price) STORED,
+            CONSTRAINT bookings_pkey PRIMARY KEY (id, date_to)
+        ) PARTITION BY RANGE (date_to)
+        """
+    )
+    # catches stays beyond the last monthly partition until one is created
+    op.execute("CREATE TABLE bookings_default PARTITION OF bookings DEFAULT")
+    # one partition bookings_pYYYYMM per month from the oldest to the latest
+    # stay and at least a year ahead; the Celery beat job adds them from here on
+    op.execute(
+        """
+        DO $$
+        DECLARE
+            month date;
+        BEGIN
+            FOR month IN
+                SELECT generate_series(
+                    date_trunc(
+                        'month', least(min(date_to), current_date)
+                    )::date,
+                    greatest(
+                        date_trunc('month', max(date_to)),
+                        date_trunc('month', current_date) + interval '12 months'
+                    )::date,
+                    interval '1 month'
+                )::date
+                FROM bookings_old
+            LOOP
+                EXECUTE format(
+                    'CREATE TABLE %I PARTITION OF bookings '
+                    'FOR VALUES FROM (%L) TO (%L)',
+                    'bookings_p' || to_char(month, 'YYYYMM'),
+                    month,
+                    month + interval '1 month'
+                );
+            END LOOP;
+        END
+        $$
+        """
+    )
+    op.execute(
+        f"INSERT INTO bookings ({STORED_COLUMNS}) "
+        f"SELECT {STORED_COLUMNS} FROM bookings_old"
+    )
+    op.execute("ALTER SEQUENCE bookings_id_seq OWNED BY bookings.id")
+    op.execute("DROP TABLE bookings_old")
+    create_indexes()
+
+
+def downgrade() -> None:
+    """Downgrade schema.
+
+    Partitions already detached by the maintenance task are not merged back.
+    """
+    op.execute("ALTER TABLE bookings RENAME TO bookings_partitioned")
+    op.execute(
+        "ALTER TABLE bookings_partitioned "
+        "RENAME CONSTRAINT bookings_pkey TO bookings_partitioned_pkey"
+    )
+    for index in (
+        "ix_bookings_id",
+        "ix_bookings_room_id",
+        "ix_bookings_user_id",
+        "ix_bookings_date_from",
+        "ix_bookings_room_id_stay",
+    ):
+        op.drop_index(index, table_name="bookings_partitioned")
+    op.execute(
+        """
+        CREATE TABLE bookings (
+            id integer NOT NULL DEFAULT nextval('bookings_id_seq'::regclass),
+            room_id integer NOT NULL REFERENCES rooms (id),
+            user_id integer NOT NULL REFERENCES users (id),
+            date_from date NOT NULL,
+            date_to date NOT NULL,
+            price integer NOT NULL,
+            total_days integer GENERATED ALWAYS AS (date_to - date_from) STORED,
+            total_cost integer
+                GENERATED ALWAYS AS ((date_to - date_from) * price) STORED,
+            CONSTRAINT bookings_pkey PRIMARY KEY (id)
+        )
+        """
+    )
+    op.execute(
+        f"INSERT INTO bookings ({STORED_COLUMNS}) "
+        f"SELECT {STORED_COLUMNS} FROM bookings_partitioned"
+    )
+    op.execute("ALTER SEQUENCE bookings_id_seq OWNED BY bookings.id")
+    op.execute("DROP TABLE bookings_partitioned")
+    create_indexes()
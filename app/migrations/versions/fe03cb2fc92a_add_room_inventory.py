@@ -0,0 +1,47 @@
+"""Add room inventory
+
+Revision ID: fe03cb2fc92a
+Revises: ef98a9cb835a
+Create Date: 2026-10-18 09:12:41.518304
+
+"""
+
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "fe03cb2fc92a"
+down_revision: Union[str, Sequence[str], None] = "ef98a9cb835a"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table(
+        "room_inventory",
+        sa.Column("room_id", sa.Integer(), nullable=False),
+        sa.Column("day", sa.Date(), nullable=False),
+        sa.Column("booked", sa.Integer(), nullable=False),
+        sa.ForeignKeyConstraint(["room_id"], ["rooms.id"], ondelete="CASCADE"),
+        sa.PrimaryKeyConstraint("room_id", "day"),
+    )
+    # one row per booked night: a stay occupies date_from .. date_to - 1
+    op.execute(
+        """
+        INSERT INTO room_inventory (room_id, day, booked)
+        SELECT b.room_id, d.day::date, count(*)
+        FROM bookings b
+        CROSS JOIN LATERAL generate_series(
+            b.date_from, b.date_to - 1, interval '1 day'
+        ) AS d(day)
+        GROUP BY b.room_id, d.day::date
+        """
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_table("room_inventory")
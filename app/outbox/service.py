@@ -0,0 +1,38 @@
+from sqlalchemy import delete, select
+from sqlalchemy.orm import Session
+
+from app.outbox.models import Outbox
+from app.services.base import BaseService
+
+BOOKING_CONFIRMATION = "booking_confirmation"
+BOOKING_SUMMARY = "booking_summary"
+
+
+class OutboxService(BaseService):
+    """Events stored with the change that caused them.
+
+    Writers add events with ``add_one`` in the same session as their change,
+    so an event exists if and only if the change was committed. The Celery
+    relay takes them off the table and publishes them.
+    """
+
+    model = Outbox
+
+    @classmethod
+    def pop_pending(cls, session: Session, limit: int) -> list[Outbox]:
+        """Delete and return the oldest ``limit`` events (sync, for workers).
+
+        Rows locked by a concurrent relay are skipped. The deletion only sticks
+        once the caller commits, so an event whose publishing fails is rolled
+        back into the table and retried.
+        """
+        pending = (
+            select(Outbox.id)
+            .order_by(Outbox.id)
+            .limit(limit)
+            .with_for_update(skip_locked=True)
+            .scalar_subquery()
+        )
+        query = delete(Outbox).where(Outbox.id.in_(pending)).returning(Outbox)
+        result = session.execute(query)
+        return sorted(result.scalars().all(), key=lambda event: event.id)
@@ -1,4 +1,4 @@
-from sqlalchemy import JSON, Column, ForeignKey, Integer, String
+from sqlalchemy import JSON, Column, Date, ForeignKey, Integer, String
 
 from app.core.database import Base
 
@@ -14,3 +14,17 @@ class Rooms(Base):
     services = Column(JSON, nullable=True)
     quantity = Column(Integer, nullable=False)
     image_id = Column(Integer)
+
+
+class RoomInventory(Base):
+    """Number of booked units of a room type per night.
+
+    Remaining units for a night are ``Rooms.quantity - booked``; nights
+    without a row have nothing booked.
+    """
+
+    __tablename__ = "room_inventory"
+
+    room_id = Column(ForeignKey("rooms.id", ondelete="CASCADE"), primary_key=True)
+    day = Column(Date, primary_key=True)
+    booked = Column(Integer, nullable=False, default=0)
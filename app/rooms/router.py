@@ -1,11 +1,19 @@
 from datetime import date
 
-from fastapi import APIRouter, status
-from fastapi_cache import FastAPICache
-from fastapi_cache.decorator import cache
-
+from fastapi import APIRouter, Depends, Query, Request, status
+from fastapi.responses import StreamingResponse
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.bulk import read_import_batches
+from app.core.cache import coalesced_cache, invalidate_cache, tagged_key_builder
+from app.core.database import get_read_session, get_session
+from app.core.dependencies import get_pagination
 from app.core.exceptions import RoomNotFoundException
-from app.rooms.schemas import SRooms, SRoomsPeriod
+from app.core.responses import ModelResponse
+from app.hotels.models import Hotels
+from app.hotels.service import HotelsService
+from app.rooms.models import Rooms
+from app.rooms.schemas import ROOMS_LIST, ROOMS_PERIOD_LIST, SRooms, SRoomsPeriod
 from app.rooms.service import RoomsService
 
 router = APIRouter(
@@ -14,46 +22,117 @@ router = APIRouter(
 )
 
 
+async def invalidate_rooms_cache(session: AsyncSession, *hotel_ids: int):
+    """Drop availability of the hotels and the city searches they appear in."""
+    hotels = await HotelsService.find_all(Hotels.id.in_(hotel_ids), session=session)
+    await invalidate_cache(hotel=hotel_ids, city={hotel.city for hotel in hotels})
+
+
 @router.get("/available", response_model=list[SRooms])
-async def get_rooms(hotel_id: int):
-    return await RoomsService.get_available_rooms_now(hotel_id)
+async def get_rooms(hotel_id: int, session: AsyncSession = Depends(get_read_session)):
+    rooms = await RoomsService.get_available_rooms_now(hotel_id, session=session)
+    return ModelResponse(rooms, ROOMS_LIST)
 
 
 @router.get("/available/period", response_model=list[SRoomsPeriod])
-@cache(expire=60)
-async def get_rooms_for_period(hotel_id: int, date_from: date, date_to: date):
-    return await RoomsService.get_available_rooms_for_period(
-        hotel_id, date_from, date_to
+@coalesced_cache(
+    expire=60,
+    stale=300,
+    namespace="rooms",
+    key_builder=tagged_key_builder(hotel="hotel_id"),
+)
+async def get_rooms_for_period(
+    hotel_id: int,
+    date_from: date,
+    date_to: date,
+    session: AsyncSession = Depends(get_read_session),
+):
+    rooms = await RoomsService.get_available_rooms_for_period(
+        hotel_id, date_from, date_to, session=session
     )
+    return ModelResponse(rooms, ROOMS_PERIOD_LIST)
 
 
 @router.get("/rooms", response_model=list[SRooms])
-async def get_all_rooms(hotel_id: int):
-    return await RoomsService.find_all(hotel_id=hotel_id)
+async def get_all_rooms(
+    hotel_id: int,
+    price_min: int | None = Query(None, ge=0),
+    price_max: int | None = Query(None, ge=0),
+    page: dict = Depends(get_pagination),
+    session: AsyncSession = Depends(get_read_session),
+):
+    criteria = []
+    if price_min is not None:
+        criteria.append(Rooms.price >= price_min)
+    if price_max is not None:
+        criteria.append(Rooms.price <= price_max)
+    rooms = await RoomsService.find_all(
+        *criteria, hotel_id=hotel_id, session=session, **page
+    )
+    return ModelResponse(
+        ROOMS_LIST.validate_python(rooms, from_attributes=True), ROOMS_LIST
+    )
 
 
 @router.post("/rooms", response_model=SRooms)
-async def create_room(hotel_id: int, room: SRooms):
-    await FastAPICache.clear()
-    return await RoomsService.add_one(hotel_id=hotel_id, **room.model_dump())
+async def create_room(
+    hotel_id: int, room: SRooms, session: AsyncSession = Depends(get_session)
+):
+    created_room = await RoomsService.add_one(
+        session=session, **{**room.model_dump(), "hotel_id": hotel_id}
+    )
+    await session.commit()
+    await invalidate_rooms_cache(session, hotel_id)
+    return created_room
+
+
+@router.get("/export")
+async def export_rooms():
+    """All rooms as CSV, streamed with COPY."""
+    return StreamingResponse(
+        RoomsService.copy_out(),
+        media_type="text/csv",
+        headers={"Content-Disposition": 'attachment; filename="rooms.csv"'},
+    )
+
+
+@router.post("/import")
+async def import_rooms(request: Request, session: AsyncSession = Depends(get_session)):
+    """Bulk load rooms of any hotels from a CSV or NDJSON body, all or nothing."""
+    imported = 0
+    hotel_ids = set()
+    async for batch in read_import_batches(request, SRooms, json_fields=("services",)):
+        imported += await RoomsService.copy_many(batch, session=session)
+        hotel_ids.update(room["hotel_id"] for room in batch)
+    await session.commit()
+    if hotel_ids:
+        await invalidate_rooms_cache(session, *hotel_ids)
+    return {"imported": imported}
 
 
 @router.put("/{room_id}", response_model=SRooms)
-async def update_room(room_id: int, room: SRooms):
-    existing_room = await RoomsService.find_by_id(room_id)
+async def update_room(
+    room_id: int, room: SRooms, session: AsyncSession = Depends(get_session)
+):
+    existing_room = await RoomsService.find_by_id(room_id, session=session)
     if not existing_room:
         raise RoomNotFoundException
 
-    updated_room = await RoomsService.update_one(existing_room, **room.model_dump())
-    await FastAPICache.clear()
+    old_hotel_id = existing_room.hotel_id
+    updated_room = await RoomsService.update_one(
+        existing_room, session=session, **room.model_dump()
+    )
+    await session.commit()
+    await invalidate_rooms_cache(session, old_hotel_id, updated_room.hotel_id)
     return updated_room
 
 
 @router.delete("/{room_id}", status_code=status.HTTP_204_NO_CONTENT)
-async def delete_room(room_id: int):
-    existing_room = await RoomsService.find_by_id(room_id)
+async def delete_room(room_id: int, session: AsyncSession = Depends(get_session)):
+    existing_room = await RoomsService.find_by_id(room_id, session=session)
     if not existing_room:
         raise RoomNotFoundException
-    await RoomsService.delete_one(existing_room)
-    await FastAPICache.clear()
+    await RoomsService.delete_one(existing_room, session=session)
+    await session.commit()
+    await invalidate_rooms_cache(session, existing_room.hotel_id)
     return
@@ -1,4 +1,4 @@
-from pydantic import BaseModel, ConfigDict
+from pydantic import BaseModel, ConfigDict, TypeAdapter
 from sqlalchemy import Any
 
 
@@ -24,7 +24,12 @@ class SRoomsPeriod(BaseModel):
     services: Any | None = None
     quantity: int
     image_id: int | None = None
+    rooms_left: int
     total_days: int
     total_cost: int
 
     model_config = ConfigDict(from_attributes=True)
+
+
+ROOMS_LIST = TypeAdapter(list[SRooms])
+ROOMS_PERIOD_LIST = TypeAdapter(list[SRoomsPeriod])
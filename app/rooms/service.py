@@ -1,11 +1,24 @@
-from datetime import date
+from collections import Counter
+from datetime import date, timedelta
 
-from sqlalchemy import func, literal_column, select
+from sqlalchemy import (
+    Date,
+    Integer,
+    and_,
+    column,
+    func,
+    literal_column,
+    select,
+    update,
+    values,
+)
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.bookings.models import Bookings
-from app.core.database import async_session_maker
-from app.rooms.models import Rooms
-from app.rooms.schemas import SRoomsPeriod
+from app.core.database import read_session_scope
+from app.core.exceptions import InvalidBookingPeriodException
+from app.rooms.models import RoomInventory, Rooms
+from app.rooms.schemas import ROOMS_LIST, ROOMS_PERIOD_LIST, SRooms, SRoomsPeriod
 from app.services.base import BaseService
 
 
@@ -13,34 +26,51 @@ class RoomsService(BaseService):
     model = Rooms
 
     @classmethod
-    async def get_available_rooms_now(cls, hotel_id: int) -> list[Rooms]:
-        async with async_session_maker() as session:
-            booked_rooms = select(Bookings.room_id).where(
-                Bookings.date_from <= func.current_date(),
-                Bookings.date_to >= func.current_date(),
+    def rooms_left_expr(cls, date_from, date_to):
+        """SQL expression for the units of a room free on every night of a period."""
+        # stays occupy nights date_from .. date_to - 1, so check-out day is free
+        booked = (
+            select(func.coalesce(func.max(RoomInventory.booked), 0))
+            .where(
+                RoomInventory.room_id == Rooms.id,
+                RoomInventory.day >= date_from,
+                RoomInventory.day < date_to,
             )
+            .scalar_subquery()
+        )
+        return Rooms.quantity - booked
+
+    @classmethod
+    async def get_available_rooms_now(
+        cls, hotel_id: int, session: AsyncSession | None = None
+    ) -> list[SRooms]:
+        async with read_session_scope(session) as session:
+            today = func.current_date()
             available_rooms = (
-                select(Rooms)
+                select(*Rooms.__table__.columns)
                 .where(Rooms.hotel_id == hotel_id)
-                .where(Rooms.id.not_in(booked_rooms))
+                .where(cls.rooms_left_expr(today, today + 1) > 0)
             )
 
             result = await session.execute(available_rooms)
-            return result.scalars().all()
+            return ROOMS_LIST.validate_python(result.mappings().all())
 
     @classmethod
     async def get_available_rooms_for_period(
-        cls, hotel_id: int, date_from: date, date_to: date
+        cls,
+        hotel_id: int,
+        date_from: date,
+        date_to: date,
+        session: AsyncSession | None = None,
     ) -> list[SRoomsPeriod]:
-        async with async_session_maker() as session:
-            booked_rooms_subq = select(Bookings.room_id).where(
-                Bookings.date_from <= date_to, Bookings.date_to >= date_from
-            )
+        if date_from >= date_to:
+            raise InvalidBookingPeriodException
 
+        async with read_session_scope(session) as session:
             total_days = (date_to - date_from).days
             total_cost_expr = total_days * Rooms.price
 
-            available_rooms = (
+            rooms = (
                 select(
                     Rooms.id,
                     Rooms.hotel_id,
@@ -50,12 +80,124 @@ class RoomsService(BaseService):
                     Rooms.services,
                     Rooms.quantity,
                     Rooms.image_id,
+                    cls.rooms_left_expr(date_from, date_to).label("rooms_left"),
                     literal_column(str(total_days)).label("total_days"),
                     total_cost_expr.label("total_cost"),
                 )
                 .where(Rooms.hotel_id == hotel_id)
-                .where(Rooms.id.not_in(booked_rooms_subq))
+                .subquery()
             )
+            available_rooms = select(rooms).where(rooms.c.rooms_left > 0)
 
             result = await session.execute(available_rooms)
-            return [SRoomsPeriod(**row) for row in result.mappings()]
+            return ROOMS_PERIOD_LIST.validate_python(result.mappings().all())
+
+    @classmethod
+    async def lock_rooms(
+        cls, session: AsyncSession, *room_ids: int
+    ) -> dict[int, Rooms]:
+        """Lock room rows for the rest of the transaction.
+
+        Every booking write locks its rooms first, so concurrent bookings of the
+        same room run one after another and cannot both pass the availability
+        check. Rows are locked in id order to avoid deadlocks.
+        """
+        query = (
+            select(Rooms)
+            .where(Rooms.id.in_(room_ids))
+            .order_by(Rooms.id)
+            .with_for_update(key_share=True)
+            .execution_options(populate_existing=True)
+        )
+        result = await session.execute(query)
+        return {room.id: room for room in result.scalars()}
+
+    @classmethod
+    async def get_rooms_left(
+        cls, session: AsyncSession, room_id: int, date_from: date, date_to: date
+    ) -> int | None:
+        """Free units of the room for every night of the period, None if no room."""
+        rooms_left = cls.rooms_left_expr(date_from, date_to)
+        query = select(rooms_left).where(Rooms.id == room_id)
+        result = await session.execute(query)
+        return result.scalar_one_or_none()
+
+    @staticmethod
+    def _nights(stays) -> Counter:
+        """Units needed per (room_id, night) by ``(room_id, date_from, date_to)``."""
+        nights = Counter()
+        for room_id, date_from, date_to in stays:
+            for n in range((date_to - date_from).days):
+                nights[room_id, date_from + timedelta(days=n)] += 1
+        return nights
+
+    @classmethod
+    async def find_overbooked(cls, session: AsyncSession, stays) -> list[int]:
+        """Rooms lacking free units for all ``stays`` together, in one query.
+
+        ``stays`` are ``(room_id, date_from, date_to)`` tuples and may request
+        the same room several times.
+        """
+        requested = values(
+            column("room_id", Integer),
+            column("day", Date),
+            column("units", Integer),
+            name="requested",
+        ).data(
+            [
+                (room_id, day, units)
+                for (room_id, day), units in cls._nights(stays).items()
+            ]
+        )
+        query = (
+            select(requested.c.room_id)
+            .distinct()
+            .join(Rooms, Rooms.id == requested.c.room_id)
+            .outerjoin(
+                RoomInventory,
+                and_(
+                    RoomInventory.room_id == requested.c.room_id,
+                    RoomInventory.day == requested.c.day,
+                ),
+            )
+            .where(
+                Rooms.quantity - func.coalesce(RoomInventory.booked, 0)
+                < requested.c.units
+            )
+        )
+        result = await session.execute(query)
+        return list(result.scalars())
+
+    @classmethod
+    async def reserve(
+        cls, session: AsyncSession, room_id: int, date_from: date, date_to: date
+    ):
+        await cls.reserve_many(session, [(room_id, date_from, date_to)])
+
+    @classmethod
+    async def reserve_many(cls, session: AsyncSession, stays):
+        """Book the nights of ``(room_id, date_from, date_to)`` stays in one upsert."""
+        nights = cls._nights(stays)
+        query = insert(RoomInventory).values(
+            [
+                {"room_id": room_id, "day": day, "booked": units}
+                for (room_id, day), units in sorted(nights.items())
+            ]
+        )
+        query = query.on_conflict_do_update(
+            index_elements=[RoomInventory.room_id, RoomInventory.day],
+            set_={"booked": RoomInventory.booked + query.excluded.booked},
+        )
+        await session.execute(query)
+
+    @classmethod
+    async def release(
+        cls, session: AsyncSession, room_id: int, date_from: date, date_to: date
+    ):
+        query = (
+            update(RoomInventory)
+            .where(RoomInventory.room_id == room_id)
+            .where(RoomInventory.day >= date_from, RoomInventory.day < date_to)
+            .values(booked=RoomInventory.booked - 1)
+        )
+        await session.execute(query)
@@ -1,44 +1,73 @@
-from sqlalchemy import delete, insert, select, update
+import asyncio
+import json
+from collections.abc import AsyncIterator
 
-from app.core.database import async_session_maker
+from asyncpg import IntegrityConstraintViolationError
+from sqlalchemy import JSON, delete, func, insert, select, text, update
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.database import read_session_scope, session_scope
+from app.core.exceptions import ImportConflictException
 
 
 class BaseService:
+    """CRUD helpers shared by the model services.
+
+    Every method accepts an optional ``session``. Routers pass the request
+    session from ``get_session`` so that all calls of one request share a
+    transaction; without it the method opens and commits its own session.
+    The ``find_*`` reads open theirs on the read replica instead.
+    """
+
     model = None  # This should be set in subclasses
 
     @classmethod
-    async def find_all(cls, **filter_by):
-        async with async_session_maker() as session:
-            query = select(cls.model).filter_by(**filter_by)
+    async def find_all(
+        cls,
+        *criteria,
+        session: AsyncSession | None = None,
+        after_id: int | None = None,
+        limit: int | None = None,
+        **filter_by,
+    ):
+        """Rows matching ``filter_by`` and the extra where ``criteria``.
+
+        With ``after_id``/``limit`` the rows are returned in id order starting
+        after ``after_id`` (keyset pagination), so a page costs the same no
+        matter how deep into the table it is.
+        """
+        async with read_session_scope(session) as session:
+            query = select(cls.model).filter_by(**filter_by).where(*criteria)
+            if after_id is not None:
+                query = query.where(cls.model.id > after_id)
+            if after_id is not None or limit is not None:
+                query = query.order_by(cls.model.id).limit(limit)
             result = await session.execute(query)
             return result.scalars().all()
 
     @classmethod
-    async def find_one_or_none(cls, **filter_by):
-        async with async_session_maker() as session:
+    async def find_one_or_none(cls, session: AsyncSession | None = None, **filter_by):
+        async with read_session_scope(session) as session:
             query = select(cls.model).filter_by(**filter_by)
             result = await session.execute(query)
             return result.scalar_one_or_none()
 
     @classmethod
-    async def find_by_id(cls, model_id: int):
-        async with async_session_maker() as session:
-            query = select(cls.model).filter_by(id=model_id)
-            result = await session.execute(query)
-            return result.scalar_one_or_none()
+    async def find_by_id(cls, model_id: int, session: AsyncSession | None = None):
+        async with read_session_scope(session) as session:
+            # served from the identity map when the request already loaded it
+            return await session.get(cls.model, model_id)
 
     @classmethod
-    async def add_one(cls, **data):
-        async with async_session_maker() as session:
+    async def add_one(cls, session: AsyncSession | None = None, **data):
+        async with session_scope(session) as session:
             query = insert(cls.model).values(**data).returning(cls.model)
             result = await session.execute(query)
-            created = result.scalar_one()
-            await session.commit()
-            return created
+            return result.scalar_one()
 
     @classmethod
-    async def update_one(cls, instance, **data):
-        async with async_session_maker() as session:
+    async def update_one(cls, instance, session: AsyncSession | None = None, **data):
+        async with session_scope(session) as session:
             query = (
                 update(cls.model)
                 .where(cls.model.id == instance.id)
@@ -46,14 +75,90 @@ class BaseService:
                 .returning(cls.model)
             )
             result = await session.execute(query)
-            updated = result.scalar_one()
-            await session.commit()
-            return updated
+            return result.scalar_one()
 
     @classmethod
-    async def delete_one(cls, instance):
-        async with async_session_maker() as session:
+    async def delete_one(cls, instance, session: AsyncSession | None = None):
+        async with session_scope(session) as session:
             query = delete(cls.model).where(cls.model.id == instance.id)
             await session.execute(query)
-            await session.commit()
             return True
+
+    @classmethod
+    async def copy_many(cls, rows: list[dict], session: AsyncSession | None = None):
+        """Insert ``rows`` with a single COPY instead of one INSERT per row.
+
+        All rows must have the same keys. When they carry explicit ids the id
+        sequence is moved past them, so later inserts do not collide.
+        """
+        if not rows:
+            return 0
+        table = cls.model.__table__
+        columns = list(rows[0])
+        json_columns = {c.name for c in table.columns if isinstance(c.type, JSON)}
+        records = [
+            tuple(
+                (
+                    json.dumps(row[c])
+                    if c in json_columns and row[c] is not None
+                    else row[c]
+                )
+                for c in columns
+            )
+            for row in rows
+        ]
+        async with session_scope(session) as session:
+            # keeps concurrent inserts from taking ids before the sequence is
+            # moved, and begins the transaction the raw COPY below runs in
+            await session.execute(
+                text(f"LOCK TABLE {table.name} IN SHARE ROW EXCLUSIVE MODE")
+            )
+            connection = await session.connection()
+            raw = await connection.get_raw_connection()
+            try:
+                await raw.driver_connection.copy_records_to_table(
+                    table.name, records=records, columns=columns
+                )
+            except IntegrityConstraintViolationError:
+                # duplicate ids or references to missing rows
+                raise ImportConflictException
+            if "id" in columns:
+                max_id = select(func.max(table.c.id)).scalar_subquery()
+                sequence = func.pg_get_serial_sequence(table.name, "id")
+                await session.execute(select(func.setval(sequence, max_id)))
+        return len(rows)
+
+    @classmethod
+    async def copy_out(cls) -> AsyncIterator[bytes]:
+        """Stream the whole table as CSV with a header row, using COPY TO.
+
+        Uses its own session on the read replica, so it can back a streaming
+        response that outlives the request session.
+        """
+        chunks: asyncio.Queue[bytes | None] = asyncio.Queue(maxsize=16)
+
+        async def put(data) -> None:
+            # asyncpg hands out a reusable buffer
+            await chunks.put(bytes(data))
+
+        async def produce():
+            try:
+                async with read_session_scope() as session:
+                    connection = await session.connection()
+                    raw = await connection.get_raw_connection()
+                    await raw.driver_connection.copy_from_table(
+                        cls.model.__tablename__,
+                        output=put,
+                        format="csv",
+                        header=True,
+                    )
+            finally:
+                await chunks.put(None)
+
+        producer = asyncio.create_task(produce())
+        try:
+            while (chunk := await chunks.get()) is not None:
+                yield chunk
+            await producer  # re-raise a failed COPY
+        finally:
+            producer.cancel()
@@ -1,9 +1,67 @@
 from celery import Celery
+from kombu import Queue
 
 from app.core.config import settings
 
 celery = Celery(
     "tasks",
     broker=f"redis://{settings.REDIS_HOST}:{settings.REDIS_PORT}",
-    include=["app.tasks.tasks"],
+    backend=settings.CELERY_RESULT_BACKEND,
+    include=["app.tasks.tasks", "app.tasks.metrics"],
 )
+
+celery.conf.update(
+    # a worker started without -Q consumes all of them; run dedicated workers
+    # with e.g. `-Q outbox,email` to keep slow maintenance jobs away from emails
+    task_queues=[
+        Queue("celery"),
+        Queue("outbox"),
+        Queue("email"),
+        Queue("maintenance"),
+    ],
+    task_default_queue="celery",
+    task_routes={
+        "app.tasks.tasks.send_*": {"queue": "email"},
+        # short and due every few seconds, its own queue so a long maintenance
+        # job does not hold it past its expiry
+        "app.tasks.tasks.relay_outbox": {"queue": "outbox"},
+        "app.tasks.tasks.rollup_hotel_stats": {"queue": "maintenance"},
+        "app.tasks.tasks.reconcile_room_inventory": {"queue": "maintenance"},
+        "app.tasks.tasks.maintain_booking_partitions": {"queue": "maintenance"},
+    },
+    worker_prefetch_multiplier=settings.CELERY_PREFETCH_MULTIPLIER,
+    worker_concurrency=settings.CELERY_CONCURRENCY,
+    # acknowledge after the task ran, a crashed worker's tasks are redelivered
+    task_acks_late=settings.CELERY_ACKS_LATE,
+    task_reject_on_worker_lost=settings.CELERY_ACKS_LATE,
+    task_soft_time_limit=settings.CELERY_TASK_SOFT_TIME_LIMIT,
+    task_time_limit=settings.CELERY_TASK_TIME_LIMIT,
+    task_ignore_result=settings.CELERY_RESULT_BACKEND is None,
+    result_expires=settings.CELERY_RESULT_EXPIRES,
+    task_serializer="json",
+    accept_content=["json"],
+)
+
+celery.conf.beat_schedule = {
+    "relay-outbox": {
+        "task": "app.tasks.tasks.relay_outbox",
+        "schedule": settings.OUTBOX_RELAY_INTERVAL,
+        # a relay still queued when the next one is due is redundant
+        "options": {"expires": settings.OUTBOX_RELAY_INTERVAL},
+    },
+    "rollup-hotel-stats": {
+        "task": "app.tasks.tasks.rollup_hotel_stats",
+        "schedule": settings.STATS_ROLLUP_INTERVAL,
+        "options": {"expires": settings.STATS_ROLLUP_INTERVAL},
+    },
+    "reconcile-room-inventory": {
+        "task": "app.tasks.tasks.reconcile_room_inventory",
+        "schedule": settings.INVENTORY_RECONCILE_INTERVAL,
+        "options": {"expires": settings.INVENTORY_RECONCILE_INTERVAL},
+    },
+    "maintain-booking-partitions": {
+        "task": "app.tasks.tasks.maintain_booking_partitions",
+        "schedule": settings.BOOKING_PARTITIONS_INTERVAL,
+        "options": {"expires": settings.BOOKING_PARTITIONS_INTERVAL},
+    },
+}
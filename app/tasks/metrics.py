@@ -0,0 +1,53 @@
+import time
+
+from celery.signals import (
+    task_failure,
+    task_postrun,
+    task_prerun,
+    worker_process_shutdown,
+    worker_ready,
+)
+from prometheus_client import start_http_server
+
+from app.core.config import settings
+from app.core.metrics import (
+    TASK_DURATION,
+    TASK_FAILURES,
+    TASKS,
+    mark_process_dead,
+    metrics_registry,
+)
+
+# start times of the tasks running in this worker process, by task id
+_started: dict[str, float] = {}
+
+
+@worker_ready.connect
+def start_metrics_server(**kwargs) -> None:
+    # runs in the main worker process; prefork children only report through
+    # PROMETHEUS_MULTIPROC_DIR
+    if settings.CELERY_METRICS_PORT is not None:
+        start_http_server(settings.CELERY_METRICS_PORT, registry=metrics_registry())
+
+
+@task_prerun.connect
+def task_started(task_id=None, **kwargs) -> None:
+    _started[task_id] = time.perf_counter()
+
+
+@task_postrun.connect
+def task_finished(task_id=None, task=None, state=None, **kwargs) -> None:
+    started = _started.pop(task_id, None)
+    if started is not None:
+        TASK_DURATION.labels(task.name).observe(time.perf_counter() - started)
+    TASKS.labels(task.name, state or "UNKNOWN").inc()
+
+
+@task_failure.connect
+def task_failed(sender=None, exception=None, **kwargs) -> None:
+    TASK_FAILURES.labels(sender.name, type(exception).__name__).inc()
+
+
+@worker_process_shutdown.connect
+def drop_process_metrics(**kwargs) -> None:
+    mark_process_dead()
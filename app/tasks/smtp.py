@@ -0,0 +1,60 @@
+import smtplib
+import threading
+from email.message import EmailMessage
+
+from celery.signals import worker_process_shutdown
+
+from app.core.config import settings
+
+# errors after which the session is dropped and the message sent on a new one
+RECONNECT_ERRORS = (smtplib.SMTPServerDisconnected, ConnectionError, TimeoutError)
+
+
+class SMTPConnectionPool:
+    """One persistent SMTP session per worker thread.
+
+    Connecting, STARTTLS and login happen once per session instead of once per
+    message. A session dropped by the server is reopened on the next send.
+    """
+
+    def __init__(self):
+        self._local = threading.local()
+
+    def _connect(self) -> smtplib.SMTP:
+        server = smtplib.SMTP(
+            settings.SMTP_HOST, settings.SMTP_PORT, timeout=settings.SMTP_TIMEOUT
+        )
+        if settings.SMTP_STARTTLS:  # TLS connection used not SSL
+            server.starttls()
+        if settings.SMTP_PASS:
+            server.login(settings.SMTP_USER, settings.SMTP_PASS)
+        return server
+
+    def send(self, message: EmailMessage) -> None:
+        server = getattr(self._local, "server", None)
+        if server is not None:
+            try:
+                server.send_message(message)
+                return
+            except RECONNECT_ERRORS:
+                self.close()
+
+        self._local.server = self._connect()
+        self._local.server.send_message(message)
+
+    def close(self) -> None:
+        server = getattr(self._local, "server", None)
+        self._local.server = None
+        if server is not None:
+            try:
+                server.quit()
+            except (smtplib.SMTPException, OSError):
+                server.close()
+
+
+smtp_pool = SMTPConnectionPool()
+
+
+@worker_process_shutdown.connect
+def close_smtp_connection(**kwargs) -> None:
+    smtp_pool.close()
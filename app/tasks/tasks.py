@@ -1,18 +1,215 @@
 import smtplib
+from datetime import date, timedelta
 
+from celery.utils.log import get_task_logger
+from celery.utils.time import get_exponential_backoff_interval
+from psycopg.errors import LockNotAvailable
+from sqlalchemy.exc import OperationalError
+
+from app.bookings import partitions
+from app.bookings.service import BookingsService
 from app.core.config import settings
+from app.core.database import sync_session_maker
+from app.hotels.service import HotelStatsService
+from app.outbox.service import BOOKING_CONFIRMATION, BOOKING_SUMMARY, OutboxService
 from app.tasks.celery import celery
-from app.tasks.email import create_booking_confirmation
+from app.tasks.email import create_booking_confirmation, create_booking_summary
+from app.tasks.smtp import smtp_pool
 
+logger = get_task_logger(__name__)
 
-@celery.task
+# temporary delivery failures, retried with exponential backoff
+SMTP_ERRORS = (smtplib.SMTPException, OSError)
+
+
+@celery.task(
+    autoretry_for=SMTP_ERRORS,
+    retry_backoff=True,
+    retry_backoff_max=settings.EMAIL_RETRY_BACKOFF_MAX,
+    max_retries=settings.EMAIL_MAX_RETRIES,
+    rate_limit=settings.EMAIL_RATE_LIMIT,
+)
 def send_booking_confirmation_email(booking: dict, email_to: str) -> None:
     email_to_mock = settings.SMTP_USER
     msg_content = create_booking_confirmation(booking, email_to_mock)
+    smtp_pool.send(msg_content)
+
+
+def send_batch(task, messages: list[dict], build_email) -> None:
+    """Send ``build_email(message)`` for each message over one SMTP session.
+
+    On a delivery failure ``task`` is retried with the messages not sent yet.
+    """
+    for sent, message in enumerate(messages):
+        try:
+            smtp_pool.send(build_email(message))
+        except smtplib.SMTPRecipientsRefused:
+            # permanent for this message, retrying would block the batch
+            logger.warning("Recipient refused: %s", message["email_to"])
+        except SMTP_ERRORS as exc:
+            countdown = get_exponential_backoff_interval(
+                factor=1,
+                retries=task.request.retries,
+                maximum=settings.EMAIL_RETRY_BACKOFF_MAX,
+                full_jitter=True,
+            )
+            raise task.retry(args=(messages[sent:],), exc=exc, countdown=countdown)
+
+
+@celery.task(
+    bind=True,
+    max_retries=settings.EMAIL_MAX_RETRIES,
+    rate_limit=settings.EMAIL_RATE_LIMIT,
+)
+def send_booking_confirmation_emails(self, messages: list[dict]) -> None:
+    """Send many confirmations over one SMTP session.
+
+    Each message is a dict with the ``booking`` and the ``email_to`` address.
+    """
+    email_to_mock = settings.SMTP_USER
+    send_batch(
+        self,
+        messages,
+        lambda message: create_booking_confirmation(message["booking"], email_to_mock),
+    )
+
+
+@celery.task(
+    bind=True,
+    max_retries=settings.EMAIL_MAX_RETRIES,
+    rate_limit=settings.EMAIL_RATE_LIMIT,
+)
+def send_booking_summary_emails(self, messages: list[dict]) -> None:
+    """Send one summary per batch booking, each with ``bookings`` and ``email_to``."""
+    email_to_mock = settings.SMTP_USER
+    send_batch(
+        self,
+        messages,
+        lambda message: create_booking_summary(message["bookings"], email_to_mock),
+    )
+
+
+# outbox event type -> task receiving a list of payloads
+OUTBOX_HANDLERS = {
+    BOOKING_CONFIRMATION: send_booking_confirmation_emails,
+    BOOKING_SUMMARY: send_booking_summary_emails,
+}
+
+
+@celery.task
+def relay_outbox() -> int:
+    """Publish pending outbox events in batches, one task per event type.
+
+    Events are removed in the transaction that publishes them. A crash between
+    publishing and committing sends the batch again, so delivery is at least
+    once.
+    """
+    relayed = 0
+    while True:
+        with sync_session_maker.begin() as session:
+            events = OutboxService.pop_pending(session, settings.OUTBOX_BATCH_SIZE)
+            batches: dict[str, list[dict]] = {}
+            for event in events:
+                batches.setdefault(event.event_type, []).append(event.payload)
+            for event_type, payloads in batches.items():
+                OUTBOX_HANDLERS[event_type].delay(payloads)
+        relayed += len(events)
+        if len(events) < settings.OUTBOX_BATCH_SIZE:
+            return relayed
+
+
+@celery.task
+def rollup_hotel_stats(date_from: str | None = None, date_to: str | None = None) -> int:
+    """Refresh ``hotel_stats`` for a window of days around today.
+
+    Pass ISO dates to backfill another range, e.g.
+    ``rollup_hotel_stats.delay("2025-01-01", "2025-12-31")``.
+    """
+    today = date.today()
+    start = (
+        date.fromisoformat(date_from)
+        if date_from
+        else today - timedelta(days=settings.STATS_LOOKBACK_DAYS)
+    )
+    end = (
+        date.fromisoformat(date_to)
+        if date_to
+        else today + timedelta(days=settings.STATS_LOOKAHEAD_DAYS)
+    )
+    with sync_session_maker.begin() as session:
+        return HotelStatsService.rollup(session, start, end)
+
+
+@celery.task
+def reconcile_room_inventory(
+    date_from: str | None = None, date_to: str | None = None
+) -> int:
+    """Recount booked nights from bookings, in chunks of rooms.
+
+    Covers INVENTORY_RECONCILE_DAYS nights from today unless ISO dates are
+    given; ``date_to`` is exclusive. Returns the number of nights fixed.
+    """
+    today = date.today()
+    start = date.fromisoformat(date_from) if date_from else today
+    end = (
+        date.fromisoformat(date_to)
+        if date_to
+        else today + timedelta(days=settings.INVENTORY_RECONCILE_DAYS)
+    )
+    fixed = 0
+    after_id = 0
+    while after_id is not None:
+        # one short transaction per chunk keeps bookings of other rooms moving
+        with sync_session_maker.begin() as session:
+            after_id, chunk_fixed = BookingsService.reconcile_inventory(
+                session, start, end, after_id=after_id
+            )
+        fixed += chunk_fixed
+    return fixed
+
+
+@celery.task
+def maintain_booking_partitions() -> dict:
+    """Create the coming months' booking partitions and detach expired ones.
+
+    Partitions of stays that ended more than BOOKING_PARTITIONS_RETAINED months
+    ago are detached and kept as archive tables.
+    """
+    current = date.today().replace(day=1)
+    with sync_session_maker.begin() as session:
+        existing = partitions.attached_partitions(session)
+
+    # one short transaction per partition; when a lock is not granted in
+    # BOOKING_PARTITIONS_LOCK_TIMEOUT the rest is left to the next run
+    def run(change, *args) -> bool:
+        try:
+            with sync_session_maker.begin() as session:
+                partitions.set_lock_timeout(
+                    session, settings.BOOKING_PARTITIONS_LOCK_TIMEOUT
+                )
+                change(session, *args)
+        except OperationalError as exc:
+            if not isinstance(exc.orig, LockNotAvailable):
+                raise
+            logger.warning("Partition change skipped, bookings is busy: %s", args)
+            return False
+        return True
+
+    created, detached = [], []
+    for n in range(settings.BOOKING_PARTITIONS_AHEAD + 1):
+        month = partitions.add_months(current, n)
+        if month in existing:
+            continue
+        if not run(partitions.create_partition, month):
+            break
+        created.append(partitions.partition_name(month))
 
-    with smtplib.SMTP(
-        settings.SMTP_HOST, settings.SMTP_PORT
-    ) as server:  # TLS connection used not SSL
-        server.starttls()  # secure the connection
-        server.login(settings.SMTP_USER, settings.SMTP_PASS)
-        server.send_message(msg_content)
+    if settings.BOOKING_PARTITIONS_RETAINED is not None:
+        oldest = partitions.add_months(current, -settings.BOOKING_PARTITIONS_RETAINED)
+        for month, name in sorted(existing.items()):
+            if month >= oldest:
+                continue
+            if not run(partitions.detach_partition, name):
+                break
+            detached.append(name)
+    return {"created": created, "detached": detached}
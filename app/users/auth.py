@@ -1,21 +1,58 @@
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta, timezone
 
 from jose import jwt
 from passlib.context import CryptContext
 from pydantic import EmailStr
+from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.core.config import settings
 from app.users.service import UsersService
 
-pwd_context = CryptContext(schemes=["pbkdf2_sha256"], deprecated="auto")
 
+def _build_pwd_context() -> CryptContext:
+    scheme = settings.PASSWORD_HASH_SCHEME
+    options = {}
+    if settings.PASSWORD_HASH_ROUNDS is not None:
+        # hashes made with other rounds, fewer or more, are flagged for a
+        # rehash on login
+        options[f"{scheme}__default_rounds"] = settings.PASSWORD_HASH_ROUNDS
+        options[f"{scheme}__min_rounds"] = settings.PASSWORD_HASH_ROUNDS
+        options[f"{scheme}__max_rounds"] = settings.PASSWORD_HASH_ROUNDS
+    # older schemes stay listed so existing hashes still verify, as deprecated
+    schemes = list(dict.fromkeys([scheme, "pbkdf2_sha256"]))
+    return CryptContext(schemes=schemes, deprecated="auto", **options)
 
-def get_password_hash(password: str) -> str:
-    return pwd_context.hash(password)
 
+pwd_context = _build_pwd_context()
 
-def verify_password(plain_password: str, hashed_password: str) -> bool:
-    return pwd_context.verify(plain_password, hashed_password)
+# hashing takes tens of milliseconds of CPU, keep it off the event loop
+hash_executor = ThreadPoolExecutor(
+    max_workers=settings.PASSWORD_HASH_WORKERS, thread_name_prefix="password-hash"
+)
+
+
+async def get_password_hash(password: str) -> str:
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(hash_executor, pwd_context.hash, password)
+
+
+async def verify_password(plain_password: str, hashed_password: str) -> bool:
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(
+        hash_executor, pwd_context.verify, plain_password, hashed_password
+    )
+
+
+async def verify_and_update_password(
+    plain_password: str, hashed_password: str
+) -> tuple[bool, str | None]:
+    """Verify a password and return a new hash if the stored one is outdated."""
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(
+        hash_executor, pwd_context.verify_and_update, plain_password, hashed_password
+    )
 
 
 def create_access_token(data: dict) -> str:
@@ -28,8 +65,20 @@ def create_access_token(data: dict) -> str:
     return encoded_jwt
 
 
-async def authenticate_user(email: EmailStr, password: str):
-    user = await UsersService.find_one_or_none(email=email)
-    if not user or not verify_password(password, user.hashed_password):
+async def authenticate_user(
+    email: EmailStr, password: str, session: AsyncSession | None = None
+):
+    user = await UsersService.find_one_or_none(session=session, email=email)
+    if not user:
+        return None
+    verified, new_hash = await verify_and_update_password(
+        password, user.hashed_password
+    )
+    if not verified:
         return None
+    if new_hash:
+        # hash scheme or rounds changed in settings since this hash was made
+        user = await UsersService.update_one(
+            user, session=session, hashed_password=new_hash
+        )
     return user
@@ -2,16 +2,22 @@ from datetime import datetime, timezone
 
 from fastapi import Depends, Request
 from jose import JWTError, jwt
+from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.core.config import settings
+from app.core.database import get_session
 from app.core.exceptions import (
     InvalidTokenFormatException,
     TokenExpiredException,
     UnauthorizedException,
     UserNotFoundException,
 )
+from app.core.ttl_cache import TTLCache
 from app.users.service import UsersService
 
+# decoded payloads by raw token, the signature is checked once per token
+token_cache = TTLCache(maxsize=settings.AUTH_CACHE_SIZE, ttl=settings.AUTH_CACHE_TTL)
+
 
 def get_token(reuquest: Request):
     access_token = reuquest.cookies.get("access_token")
@@ -20,13 +26,18 @@ def get_token(reuquest: Request):
     return reuquest.cookies.get("access_token")
 
 
-async def get_current_user(token: str = Depends(get_token)):
-    try:
-        payload = jwt.decode(
-            token, settings.SECRET_KEY, algorithms=[settings.ALGORITHM]
-        )
-    except JWTError:
-        raise InvalidTokenFormatException
+async def get_current_user(
+    token: str = Depends(get_token), session: AsyncSession = Depends(get_session)
+):
+    payload = token_cache.get(token)
+    if payload is None:
+        try:
+            payload = jwt.decode(
+                token, settings.SECRET_KEY, algorithms=[settings.ALGORITHM]
+            )
+        except JWTError:
+            raise InvalidTokenFormatException
+        token_cache.set(token, payload)
     user_id: str = payload.get("sub")
     if user_id is None:
         raise InvalidTokenFormatException
@@ -37,7 +48,20 @@ async def get_current_user(token: str = Depends(get_token)):
     if expire is None or expire < datetime.now(timezone.utc).timestamp():
         raise TokenExpiredException
 
-    user = await UsersService.find_one_or_none(id=int(user_id))
+    user = await UsersService.find_by_id_cached(int(user_id), session=session)
     if user is None:
         raise UserNotFoundException
     return user
+
+
+async def get_admin_user(
+    request: Request, session: AsyncSession = Depends(get_session)
+):
+    """User signed in to the admin dashboard, from its session cookie."""
+    admin_session = request.session.get("user")
+    if not admin_session:
+        raise UnauthorizedException
+    user = await UsersService.find_by_id_cached(admin_session["id"], session=session)
+    if user is None:
+        raise UnauthorizedException
+    return user
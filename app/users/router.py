@@ -1,5 +1,8 @@
 from fastapi import APIRouter, Depends, Response, status
+from sqlalchemy.ext.asyncio import AsyncSession
 
+from app.core.database import get_session
+from app.core.dependencies import get_pagination
 from app.core.exceptions import (
     InvalidCredentialsException,
     UserAlreadyExistsException,
@@ -17,19 +20,27 @@ router = APIRouter(
 
 
 @router.post("/register", status_code=status.HTTP_201_CREATED, response_model=SUserRead)
-async def register_user(user_data: SUserRegister):
-    existing_user = await UsersService.find_one_or_none(email=user_data.email)
+async def register_user(
+    user_data: SUserRegister, session: AsyncSession = Depends(get_session)
+):
+    existing_user = await UsersService.find_one_or_none(
+        session=session, email=user_data.email
+    )
     if existing_user:
         raise UserAlreadyExistsException
-    hashed_password = get_password_hash(user_data.password)
+    hashed_password = await get_password_hash(user_data.password)
     return await UsersService.add_one(
-        email=user_data.email, hashed_password=hashed_password
+        session=session, email=user_data.email, hashed_password=hashed_password
     )
 
 
 @router.post("/login")
-async def login_user(user_data: SUserRegister, response: Response):
-    user = await authenticate_user(user_data.email, user_data.password)
+async def login_user(
+    user_data: SUserRegister,
+    response: Response,
+    session: AsyncSession = Depends(get_session),
+):
+    user = await authenticate_user(user_data.email, user_data.password, session)
     if not user:
         raise InvalidCredentialsException
     access_token = create_access_token(
@@ -50,13 +61,15 @@ async def get_me(current_user: SUserRead = Depends(get_current_user)):
 
 
 @router.get("/users", response_model=list[SUserRead])
-async def get_users():
-    return await UsersService.find_all()
+async def get_users(
+    page: dict = Depends(get_pagination), session: AsyncSession = Depends(get_session)
+):
+    return await UsersService.find_all(session=session, **page)
 
 
 @router.get("/users/{user_id}", response_model=SUserRead)
-async def get_user(user_id: int):
-    user = await UsersService.find_one_or_none(id=user_id)
+async def get_user(user_id: int, session: AsyncSession = Depends(get_session)):
+    user = await UsersService.find_by_id(user_id, session=session)
     if not user:
         raise UserNotFoundException
 
@@ -64,14 +77,18 @@ async def get_user(user_id: int):
 
 
 @router.post("/users", response_model=SUserRead, status_code=status.HTTP_201_CREATED)
-async def create_user(user_data: SUserRegister):
-    existing_user = await UsersService.find_one_or_none(email=user_data.email)
+async def create_user(
+    user_data: SUserRegister, session: AsyncSession = Depends(get_session)
+):
+    existing_user = await UsersService.find_one_or_none(
+        session=session, email=user_data.email
+    )
     if existing_user:
         raise UserAlreadyExistsException
 
-    hashed_password = get_password_hash(user_data.password)
+    hashed_password = await get_password_hash(user_data.password)
     new_user = await UsersService.add_one(
-        email=user_data.email, hashed_password=hashed_password
+        session=session, email=user_data.email, hashed_password=hashed_password
     )
 
     return SUserRead.model_validate(new_user)
@@ -80,8 +97,10 @@ async def create_user(user_data: SUserRegister):
 @router.put(
     "/users/{user_id}", response_model=SUserRead, status_code=status.HTTP_202_ACCEPTED
 )
-async def update_user(user_id: int, user_data: SUserUpdate):
-    user = await UsersService.find_by_id(user_id)
+async def update_user(
+    user_id: int, user_data: SUserUpdate, session: AsyncSession = Depends(get_session)
+):
+    user = await UsersService.find_by_id(user_id, session=session)
     if not user:
         raise UserNotFoundException
 
@@ -89,14 +108,19 @@ async def update_user(user_id: int, user_data: SUserUpdate):
     if user_data.email is not None:
         update_fields["email"] = user_data.email
     if user_data.password is not None:
-        update_fields["hashed_password"] = get_password_hash(user_data.password)
+        update_fields["hashed_password"] = await get_password_hash(user_data.password)
 
-    return await UsersService.update_one(user, **update_fields)
+    updated_user = await UsersService.update_one(user, session=session, **update_fields)
+    await session.commit()
+    UsersService.forget(user_id)
+    return updated_user
 
 
 @router.delete("/users/{user_id}", status_code=status.HTTP_204_NO_CONTENT)
-async def delete_user(user_id: int):
-    user = await UsersService.find_by_id(user_id)
+async def delete_user(user_id: int, session: AsyncSession = Depends(get_session)):
+    user = await UsersService.find_by_id(user_id, session=session)
     if not user:
         raise UserNotFoundException
-    return await UsersService.delete_one(user)
+    await UsersService.delete_one(user, session=session)
+    await session.commit()
+    UsersService.forget(user_id)
@@ -1,6 +1,32 @@
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+from app.core.ttl_cache import TTLCache
 from app.services.base import BaseService
 from app.users.models import Users
+from app.users.schemas import SUserRead
+
+user_cache = TTLCache(maxsize=settings.AUTH_CACHE_SIZE, ttl=settings.AUTH_CACHE_TTL)
 
 
 class UsersService(BaseService):
     model = Users
+
+    @classmethod
+    async def find_by_id_cached(
+        cls, user_id: int, session: AsyncSession | None = None
+    ) -> SUserRead | None:
+        """User lookup for authentication, served from ``user_cache`` when warm."""
+        user = user_cache.get(user_id)
+        if user is None:
+            found = await cls.find_by_id(user_id, session=session)
+            if found is None:
+                return None
+            user = SUserRead.model_validate(found)
+            user_cache.set(user_id, user)
+        return user
+
+    @classmethod
+    def forget(cls, user_id: int) -> None:
+        """Evict a user from ``user_cache`` after it was changed or deleted."""
+        user_cache.pop(user_id)
@@ -0,0 +1,112 @@
+"""Compare the booking overlap query with and without the GiST stay index.
+
+Seeds a temporary copy of the bookings table (dropped with the connection),
+so it can run against any database where the migrations have installed
+btree_gist:
+
+    python -m benchmarks.booking_overlap --rows 2000000 --rooms 5000
+"""
+
+import argparse
+import json
+import random
+import statistics
+import time
+from datetime import date, timedelta
+
+from sqlalchemy import text
+
+from app.core.database import sync_engine
+
+BTREE_QUERY = """
+SELECT count(*) FROM bench_bookings
+WHERE room_id = :room_id AND date_from < :date_to AND date_to > :date_from
+"""
+
+GIST_QUERY = """
+SELECT count(*) FROM bench_bookings
+WHERE room_id = :room_id
+  AND daterange(date_from, date_to) && daterange(:date_from, :date_to)
+"""
+
+START = date(2015, 1, 1)
+DAYS = 3650
+
+
+def measure(connection, query: str, params: list[dict]) -> dict:
+    timings = []
+    for p in params:
+        start = time.perf_counter()
+        connection.execute(text(query), p).scalar_one()
+        timings.append(time.perf_counter() - start)
+    timings.sort()
+    return {
+        "p50_ms": round(statistics.median(timings) * 1000, 3),
+        "p95_ms": round(timings[int(len(timings) * 0.95) - 1] * 1000, 3),
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, default=2_000_000)
+    parser.add_argument("--rooms", type=int, default=5_000)
+    parser.add_argument("--queries", type=int, default=500)
+    args = parser.parse_args()
+
+    rng = random.Random(0)
+    params = []
+    for _ in range(args.queries):
+        date_from = START + timedelta(days=rng.randrange(DAYS))
+        params.append(
+            {
+                "room_id": rng.randint(1, args.rooms),
+                "date_from": date_from,
+                "date_to": date_from + timedelta(days=rng.randint(1, 14)),
+            }
+        )
+
+    with sync_engine.connect() as connection:
+        connection.execute(
+            text(
+                "CREATE TEMP TABLE bench_bookings "
+                "(room_id int, date_from date, date_to date)"
+            )
+        )
+        connection.execute(
+            text("""
+                INSERT INTO bench_bookings
+                SELECT 1 + (random() * (:rooms - 1))::int,
+                       d,
+                       d + 1 + (random() * 13)::int
+                FROM (
+                    SELECT :start + (random() * :days)::int AS d
+                    FROM generate_series(1, :rows)
+                ) AS s
+                """),
+            {"rooms": args.rooms, "rows": args.rows, "start": START, "days": DAYS},
+        )
+        # the indexes bookings had before the stay index
+        connection.execute(text("CREATE INDEX ON bench_bookings (room_id)"))
+        connection.execute(text("ANALYZE bench_bookings"))
+        btree = measure(connection, BTREE_QUERY, params)
+
+        connection.execute(
+            text(
+                "CREATE INDEX ON bench_bookings "
+                "USING gist (room_id, daterange(date_from, date_to))"
+            )
+        )
+        connection.execute(text("ANALYZE bench_bookings"))
+        gist = measure(connection, GIST_QUERY, params)
+        connection.rollback()  # drops the temporary table
+
+    print(
+        json.dumps(
+            {"rows": args.rows, "rooms": args.rooms, "btree": btree, "gist": gist},
+            indent=2,
+        )
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,70 @@
+"""Measure the cost of rendering one booking confirmation email.
+
+Run from the project root with the usual environment (``.env``) loaded:
+
+    python -m benchmarks.email_render --number 5000
+"""
+
+import argparse
+import json
+import time
+import timeit
+
+from app.tasks.email import create_booking_confirmation, env
+
+BOOKING = {
+    "id": 1,
+    "room_id": 1,
+    "user_id": 1,
+    "date_from": "2025-07-01",
+    "date_to": "2025-07-05",
+    "price": 120,
+    "total_days": 4,
+    "total_cost": 480,
+}
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--number", type=int, default=5000)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    # first render includes loading and compiling the templates
+    env.cache.clear()
+    start = time.perf_counter()
+    create_booking_confirmation(BOOKING, "guest@example.com")
+    cold = time.perf_counter() - start
+
+    runs = timeit.repeat(
+        lambda: create_booking_confirmation(BOOKING, "guest@example.com"),
+        number=args.number,
+        repeat=args.repeat,
+    )
+    warm = min(runs) / args.number
+
+    # template rendering alone, without building the MIME message
+    html = env.get_template("booking_confirmation.html")
+    text = env.get_template("booking_confirmation.txt")
+    runs = timeit.repeat(
+        lambda: (html.render(booking=BOOKING), text.render(booking=BOOKING)),
+        number=args.number,
+        repeat=args.repeat,
+    )
+    render = min(runs) / args.number
+
+    print(
+        json.dumps(
+            {
+                "cold_render_us": round(cold * 1e6, 1),
+                "warm_render_us": round(warm * 1e6, 1),
+                "templates_only_us": round(render * 1e6, 1),
+                "messages_per_second": round(1 / warm),
+            },
+            indent=2,
+        )
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,264 @@
+"""Drive the API through request scenarios and report latency and throughput.
+
+Runs in process against the ASGI app through httpx, or against a running
+server with ``--url``. The app's lifespan is run, so Redis must be reachable
+for the cache. Seed the database with ``benchmarks.seed`` first; the booking
+scenarios add bookings to it.
+
+    python -m benchmarks.load --requests 2000 --concurrency 32 > run.json
+    python -m benchmarks.load --scenario search --scenario book --no-cache
+
+Each scenario reports the status codes seen, p50/p95/p99 latency and requests
+per second. ``contention`` fires parallel bookings at one room type for the
+same nights and checks that exactly the free units were sold.
+"""
+
+import argparse
+import asyncio
+import json
+import random
+import statistics
+import time
+from collections import Counter
+from contextlib import AsyncExitStack
+from datetime import date, timedelta
+
+import httpx
+from sqlalchemy import func, select
+
+from app.core.database import session_scope
+from app.hotels.models import Hotels
+from app.rooms.models import RoomInventory, Rooms
+from app.users.models import Users
+
+SCENARIOS = ["login", "search", "availability", "list_bookings", "book", "contention"]
+# statuses that are a correct answer, e.g. a sold out room for a booking
+EXPECTED = {"book": {200, 409}, "contention": {200, 409}}
+
+
+class Dataset:
+    """Ids, cities and users of the seeded database the scenarios draw from."""
+
+    def __init__(
+        self, rng: random.Random, password: str, cities, hotel_ids, rooms, emails
+    ):
+        self.rng = rng
+        self.password = password
+        self.cities = cities
+        self.hotel_ids = hotel_ids
+        self.rooms = rooms  # (room id, quantity)
+        self.emails = emails
+        self.tokens: list[str] = []
+
+    @classmethod
+    async def load(cls, rng: random.Random, password: str, users: int) -> "Dataset":
+        async with session_scope() as session:
+            cities = (await session.scalars(select(Hotels.city).distinct())).all()
+            hotel_ids = (await session.scalars(select(Hotels.id))).all()
+            rooms = (await session.execute(select(Rooms.id, Rooms.quantity))).all()
+            emails = (
+                await session.scalars(
+                    select(Users.email).order_by(func.random()).limit(users)
+                )
+            ).all()
+        if not (hotel_ids and rooms and emails):
+            raise SystemExit("no data, run python -m benchmarks.seed first")
+        return cls(rng, password, cities, hotel_ids, rooms, emails)
+
+    def period(self, max_nights: int = 7) -> tuple[date, date]:
+        date_from = date.today() + timedelta(days=self.rng.randrange(1, 180))
+        return date_from, date_from + timedelta(days=self.rng.randint(1, max_nights))
+
+    def auth(self) -> dict:
+        return {"Cookie": f"access_token={self.rng.choice(self.tokens)}"}
+
+
+def summarize(timings: list[float], statuses: Counter, elapsed: float) -> dict:
+    cuts = statistics.quantiles(timings, n=100) if len(timings) > 1 else timings * 99
+    return {
+        "requests": len(timings),
+        "statuses": {str(code): count for code, count in sorted(statuses.items())},
+        "throughput_rps": round(len(timings) / elapsed, 1),
+        "latency_ms": {
+            "mean": round(statistics.fmean(timings) * 1000, 2),
+            "p50": round(cuts[49] * 1000, 2),
+            "p95": round(cuts[94] * 1000, 2),
+            "p99": round(cuts[98] * 1000, 2),
+            "max": round(max(timings) * 1000, 2),
+        },
+    }
+
+
+async def run(make_request, requests: int, concurrency: int) -> dict:
+    """Send ``requests`` requests from ``concurrency`` concurrent workers."""
+    timings, statuses = [], Counter()
+    remaining = iter(range(requests))
+
+    async def worker():
+        for _ in remaining:
+            started = time.perf_counter()
+            response = await make_request()
+            timings.append(time.perf_counter() - started)
+            statuses[response.status_code] += 1
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    return summarize(timings, statuses, time.perf_counter() - started)
+
+
+def scenario_requests(client: httpx.AsyncClient, data: Dataset, headers: dict):
+    """Request factories of the throughput scenarios, by name."""
+
+    def login():
+        email = data.rng.choice(data.emails)
+        payload = {"email": email, "password": data.password}
+        return client.post("/auth/login", json=payload)
+
+    def search():
+        date_from, date_to = data.period()
+        params = {
+            "city": data.rng.choice(data.cities),
+            "date_from": date_from,
+            "date_to": date_to,
+        }
+        return client.get("/hotels/search", params=params, headers=headers)
+
+    def availability():
+        date_from, date_to = data.period()
+        params = {
+            "hotel_id": data.rng.choice(data.hotel_ids),
+            "date_from": date_from,
+            "date_to": date_to,
+        }
+        return client.get("/rooms/available/period", params=params, headers=headers)
+
+    def list_bookings():
+        return client.get("/bookings", headers=headers | data.auth())
+
+    def book():
+        date_from, date_to = data.period(max_nights=4)
+        payload = {
+            "room_id": data.rng.choice(data.rooms)[0],
+            "date_from": date_from.isoformat(),
+            "date_to": date_to.isoformat(),
+        }
+        return client.post("/bookings", json=payload, headers=data.auth())
+
+    return {
+        "login": login,
+        "search": search,
+        "availability": availability,
+        "list_bookings": list_bookings,
+        "book": book,
+    }
+
+
+async def contention(client: httpx.AsyncClient, data: Dataset, attempts: int) -> dict:
+    """Book the same nights of one room type ``attempts`` times at once."""
+    room_id, quantity = data.rng.choice(data.rooms)
+    # far enough ahead that the seeded and booked nights are not in the way
+    date_from = date.today() + timedelta(days=data.rng.randrange(3 * 365, 30 * 365))
+    date_to = date_from + timedelta(days=3)
+    async with session_scope() as session:
+        booked = await session.scalar(
+            select(func.coalesce(func.max(RoomInventory.booked), 0)).where(
+                RoomInventory.room_id == room_id,
+                RoomInventory.day >= date_from,
+                RoomInventory.day < date_to,
+            )
+        )
+
+    payload = {
+        "room_id": room_id,
+        "date_from": date_from.isoformat(),
+        "date_to": date_to.isoformat(),
+    }
+    started = time.perf_counter()
+
+    async def attempt():
+        request_started = time.perf_counter()
+        response = await client.post("/bookings", json=payload, headers=data.auth())
+        return time.perf_counter() - request_started, response.status_code
+
+    results = await asyncio.gather(*(attempt() for _ in range(attempts)))
+    elapsed = time.perf_counter() - started
+    statuses = Counter(status for _, status in results)
+    report = summarize([timing for timing, _ in results], statuses, elapsed)
+    expected = min(quantity - booked, attempts)
+    report["booked"] = statuses[200]
+    report["expected_booked"] = expected
+    report["ok"] = statuses[200] == expected
+    return report
+
+
+async def log_in(client: httpx.AsyncClient, data: Dataset) -> None:
+    for email in data.emails:
+        response = await client.post(
+            "/auth/login", json={"email": email, "password": data.password}
+        )
+        response.raise_for_status()
+        data.tokens.append(response.json()["access_token"])
+
+
+async def main_async(args) -> dict:
+    data = await Dataset.load(random.Random(args.seed), args.password, args.users)
+    headers = {"Cache-Control": "no-cache"} if args.no_cache else {}
+
+    async with AsyncExitStack() as stack:
+        if args.url:
+            client = httpx.AsyncClient(base_url=args.url, timeout=60)
+        else:
+            from app.main import app
+
+            await stack.enter_async_context(app.router.lifespan_context(app))
+            transport = httpx.ASGITransport(app=app)
+            client = httpx.AsyncClient(transport=transport, base_url="http://bench")
+        await stack.enter_async_context(client)
+
+        await log_in(client, data)
+        factories = scenario_requests(client, data, headers)
+        results = {}
+        for name in args.scenario or SCENARIOS:
+            if name == "contention":
+                results[name] = await contention(client, data, args.contention)
+            else:
+                results[name] = await run(
+                    factories[name], args.requests, args.concurrency
+                )
+            unexpected = set(results[name]["statuses"]) - {
+                str(code) for code in EXPECTED.get(name, {200})
+            }
+            results[name]["unexpected_statuses"] = sorted(unexpected)
+
+    return {
+        "target": args.url or "asgi",
+        "requests": args.requests,
+        "concurrency": args.concurrency,
+        "cache": not args.no_cache,
+        "seed": args.seed,
+        "scenarios": results,
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument(
+        "--scenario", action="append", choices=SCENARIOS, help="repeatable"
+    )
+    parser.add_argument("--requests", type=int, default=1000, help="per scenario")
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--contention", type=int, default=50, help="parallel bookings")
+    parser.add_argument("--users", type=int, default=50, help="users logged in")
+    parser.add_argument("--password", default="benchmark")
+    parser.add_argument("--url", help="base URL of a running server")
+    parser.add_argument(
+        "--no-cache", action="store_true", help="send Cache-Control: no-cache"
+    )
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    print(json.dumps(asyncio.run(main_async(args)), indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,253 @@
+"""Fill the database with synthetic hotels, rooms, users and bookings.
+
+Rows are loaded with COPY. Check-ins cluster around summer and weekends, and
+popular hotels get most of the bookings. No night is booked over a room's
+quantity, and ``room_inventory`` matches the bookings. Every user has the
+password given with ``--password``, which ``benchmarks.load`` logs in with.
+
+    python -m benchmarks.seed --hotels 500 --bookings 200000 --truncate
+"""
+
+import argparse
+import asyncio
+import json
+import math
+import random
+import time
+from collections import Counter
+from datetime import date, timedelta
+from itertools import accumulate
+
+from sqlalchemy import func, select, text
+
+from app.bookings.partitions import add_months, attached_partitions, create_partition
+from app.bookings.service import BookingsService
+from app.core.config import settings
+from app.core.database import session_scope, sync_session_maker
+from app.hotels.service import HotelsService
+from app.rooms.models import RoomInventory
+from app.rooms.service import RoomsService
+from app.services.base import BaseService
+from app.users.auth import get_password_hash
+from app.users.service import UsersService
+
+CITIES = [
+    "Tashkent",
+    "Samarkand",
+    "Bukhara",
+    "Khiva",
+    "Istanbul",
+    "Paris",
+    "Rome",
+    "Barcelona",
+    "Berlin",
+    "Prague",
+    "Vienna",
+    "Dubai",
+    "Bangkok",
+    "Tokyo",
+    "Seoul",
+    "New York",
+]
+SERVICES = ["Wi-Fi", "Parking", "Pool", "Spa", "Gym", "Breakfast", "Air conditioning"]
+ROOM_TYPES = ["Standard", "Superior", "Deluxe", "Family", "Suite"]
+# share of stays by number of nights, 1 .. 14
+NIGHTS_WEIGHTS = [18, 24, 20, 12, 8, 5, 5, 2, 1, 1, 1, 1, 0.5, 1.5]
+TRUNCATE = (
+    "TRUNCATE users, hotels, rooms, bookings, room_inventory, hotel_stats, outbox "
+    "RESTART IDENTITY CASCADE"
+)
+
+
+class RoomInventoryService(BaseService):
+    model = RoomInventory
+
+
+def zipf_weights(count: int, exponent: float = 0.8) -> list[float]:
+    return [1 / (rank**exponent) for rank in range(1, count + 1)]
+
+
+def check_in_weights(days: list[date]) -> list[float]:
+    weights = []
+    for day in days:
+        # peak in late July, low in late January
+        season = 1 + 0.6 * math.cos(2 * math.pi * (day.timetuple().tm_yday - 205) / 365)
+        weekend = 1.5 if day.weekday() in (4, 5) else 1.0
+        weights.append(season * weekend)
+    return weights
+
+
+async def next_id(service) -> int:
+    async with session_scope() as session:
+        max_id = await session.scalar(select(func.max(service.model.id)))
+    return (max_id or 0) + 1
+
+
+def generate(args, rng: random.Random, first_ids: dict[str, int]) -> dict:
+    hotels, rooms = [], []
+    room_id = first_ids["rooms"]
+    for hotel_id in range(first_ids["hotels"], first_ids["hotels"] + args.hotels):
+        hotel_rooms = []
+        for _ in range(rng.randint(1, args.rooms_per_hotel * 2 - 1)):
+            room_type = rng.choice(ROOM_TYPES)
+            hotel_rooms.append(
+                {
+                    "id": room_id,
+                    "hotel_id": hotel_id,
+                    "name": f"{room_type} room",
+                    "description": None,
+                    "price": rng.randrange(40, 400, 5)
+                    * (2 if room_type == "Suite" else 1),
+                    "services": rng.sample(SERVICES, rng.randint(0, 3)),
+                    "quantity": rng.randint(1, 10),
+                    "image_id": rng.randint(1, 100),
+                }
+            )
+            room_id += 1
+        rooms.extend(hotel_rooms)
+        hotels.append(
+            {
+                "id": hotel_id,
+                "name": f"Hotel {hotel_id}",
+                "city": rng.choices(CITIES, zipf_weights(len(CITIES)))[0],
+                "location": f"{rng.randint(1, 200)} Main Street",
+                "services": rng.sample(SERVICES, rng.randint(1, 5)),
+                "rooms_quantity": sum(room["quantity"] for room in hotel_rooms),
+                "image_id": str(rng.randint(1, 100)),
+            }
+        )
+
+    users = [
+        {"id": user_id, "email": f"user{user_id}@bench.example.com"}
+        for user_id in range(first_ids["users"], first_ids["users"] + args.users)
+    ]
+
+    today = date.today()
+    days = [
+        today + timedelta(days=offset)
+        for offset in range(-args.past_days, args.future_days)
+    ]
+    day_weights = list(accumulate(check_in_weights(days)))
+    # a few rooms get most of the bookings, spread over hotels and cities
+    room_weights = list(accumulate(zipf_weights(len(rooms), 0.6)))
+    popular_rooms = rng.sample(rooms, len(rooms))
+
+    bookings, nights = [], Counter()
+    booking_id = first_ids["bookings"]
+    for _ in range(args.bookings):
+        # a few tries for a room with all nights free, else the stay is skipped
+        for _ in range(5):
+            room = rng.choices(popular_rooms, cum_weights=room_weights)[0]
+            date_from = rng.choices(days, cum_weights=day_weights)[0]
+            stay = rng.choices(range(1, 15), NIGHTS_WEIGHTS)[0]
+            stay_nights = [
+                (room["id"], date_from + timedelta(days=n)) for n in range(stay)
+            ]
+            if all(nights[night] < room["quantity"] for night in stay_nights):
+                break
+        else:
+            continue
+        nights.update(stay_nights)
+        bookings.append(
+            {
+                "id": booking_id,
+                "room_id": room["id"],
+                "user_id": rng.choice(users)["id"],
+                "date_from": date_from,
+                "date_to": date_from + timedelta(days=stay),
+                "price": room["price"],
+            }
+        )
+        booking_id += 1
+
+    inventory = [
+        {"room_id": room_id, "day": day, "booked": booked}
+        for (room_id, day), booked in nights.items()
+    ]
+    return {
+        "hotels": hotels,
+        "rooms": rooms,
+        "users": users,
+        "bookings": bookings,
+        "inventory": inventory,
+    }
+
+
+def ensure_partitions(bookings: list[dict]) -> None:
+    """Create the monthly partitions the bookings fall into."""
+    if not bookings:
+        return
+    first = min(booking["date_to"] for booking in bookings).replace(day=1)
+    last = max(booking["date_to"] for booking in bookings).replace(day=1)
+    with sync_session_maker.begin() as session:
+        attached = attached_partitions(session)
+        month = first
+        while month <= last:
+            if month not in attached:
+                create_partition(session, month)
+            month = add_months(month, 1)
+
+
+async def copy_in_batches(service, rows: list[dict], session) -> None:
+    for start in range(0, len(rows), settings.BULK_BATCH_SIZE):
+        await service.copy_many(rows[start : start + settings.BULK_BATCH_SIZE], session)
+
+
+async def seed(args) -> dict:
+    if args.truncate:
+        async with session_scope() as session:
+            await session.execute(text(TRUNCATE))
+
+    first_ids = {
+        "hotels": await next_id(HotelsService),
+        "rooms": await next_id(RoomsService),
+        "users": await next_id(UsersService),
+        "bookings": await next_id(BookingsService),
+    }
+    rng = random.Random(args.seed)
+    started = time.perf_counter()
+    data = generate(args, rng, first_ids)
+    generated = time.perf_counter() - started
+
+    hashed_password = await get_password_hash(args.password)
+    for user in data["users"]:
+        user["hashed_password"] = hashed_password
+
+    ensure_partitions(data["bookings"])
+    started = time.perf_counter()
+    async with session_scope() as session:
+        await copy_in_batches(HotelsService, data["hotels"], session)
+        await copy_in_batches(RoomsService, data["rooms"], session)
+        await copy_in_batches(UsersService, data["users"], session)
+        await copy_in_batches(BookingsService, data["bookings"], session)
+        await copy_in_batches(RoomInventoryService, data["inventory"], session)
+        await session.execute(text("ANALYZE"))
+    loaded = time.perf_counter() - started
+
+    return {
+        "rows": {name: len(rows) for name, rows in data.items()},
+        "generate_s": round(generated, 2),
+        "copy_s": round(loaded, 2),
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--hotels", type=int, default=200)
+    parser.add_argument("--rooms-per-hotel", type=int, default=8, help="on average")
+    parser.add_argument("--users", type=int, default=5_000)
+    parser.add_argument("--bookings", type=int, default=50_000)
+    parser.add_argument("--past-days", type=int, default=365)
+    parser.add_argument("--future-days", type=int, default=180)
+    parser.add_argument("--password", default="benchmark")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument(
+        "--truncate", action="store_true", help="empty the tables before seeding"
+    )
+    args = parser.parse_args()
+
+    print(json.dumps(asyncio.run(seed(args)), indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,113 @@
+"""Fixtures of the integration tests.
+
+The tests run against the database of the settings and empty its tables, so
+they are skipped unless ``DB_NAME`` ends with ``test`` and the database is
+reachable. The schema must be migrated. Redis is replaced by fakeredis.
+"""
+
+import httpx
+import pytest
+from fakeredis import FakeAsyncRedis
+from fastapi_cache import FastAPICache
+from sqlalchemy import text
+from sqlalchemy.exc import SQLAlchemyError
+
+from app.core.cache import TaggedRedisBackend
+from app.core.config import settings
+from app.core.database import engine, read_engine, session_scope
+from app.hotels.models import Hotels
+from app.main import app
+from app.rooms.models import Rooms
+from app.users.auth import get_password_hash
+from app.users.models import Users
+from app.users.service import user_cache
+
+TRUNCATE = (
+    "TRUNCATE users, hotels, rooms, bookings, room_inventory, hotel_stats, outbox "
+    "RESTART IDENTITY CASCADE"
+)
+PASSWORD = "password"
+
+
+@pytest.fixture
+def anyio_backend():
+    return "asyncio"
+
+
+@pytest.fixture
+async def db():
+    if not settings.DB_NAME.endswith("test"):
+        pytest.skip("DB_NAME must end with 'test', the tests empty its tables")
+    try:
+        async with engine.begin() as conn:
+            await conn.execute(text(TRUNCATE))
+    except (OSError, SQLAlchemyError) as exc:
+        pytest.skip(f"database is not available: {exc}")
+    user_cache.clear()
+    yield
+    # pooled connections belong to the event loop of this test
+    await engine.dispose()
+    await read_engine.dispose()
+
+
+@pytest.fixture
+async def cache():
+    redis = FakeAsyncRedis()
+    FastAPICache.init(TaggedRedisBackend(redis), prefix="cache")
+    yield redis
+    FastAPICache.reset()
+
+
+@pytest.fixture
+async def client(db, cache):
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://test") as c:
+        yield c
+
+
+@pytest.fixture
+async def user(db) -> Users:
+    async with session_scope() as session:
+        user = Users(
+            email="guest@example.com",
+            hashed_password=await get_password_hash(PASSWORD),
+        )
+        session.add(user)
+    return user
+
+
+@pytest.fixture
+async def auth_client(client, user):
+    response = await client.post(
+        "/auth/login", json={"email": user.email, "password": PASSWORD}
+    )
+    response.raise_for_status()
+    client.cookies.set("access_token", response.json()["access_token"])
+    return client
+
+
+@pytest.fixture
+async def admin_client(client, user):
+    response = await client.post(
+        "/admin/login", data={"username": user.email, "password": PASSWORD}
+    )
+    assert response.status_code == 302, response.text
+    return client
+
+
+@pytest.fixture
+async def room(db) -> Rooms:
+    async with session_scope() as session:
+        hotel = Hotels(
+            name="Hotel",
+            city="Paris",
+            location="1 Main Street",
+            services=["Wi-Fi"],
+            rooms_quantity=3,
+            image_id="1",
+        )
+        session.add(hotel)
+        await session.flush()
+        room = Rooms(hotel_id=hotel.id, name="Standard room", price=100, quantity=3)
+        session.add(room)
+    return room
@@ -0,0 +1,20 @@
+import pytest
+
+pytestmark = pytest.mark.anyio
+
+
+@pytest.mark.parametrize("url", ["/hotels/search", "/rooms/available/period"])
+@pytest.mark.parametrize("date_to", ["2030-01-01", "2029-12-28"])
+async def test_empty_or_reversed_period_is_rejected(client, cache, room, url, date_to):
+    params = {
+        "city": "Paris",
+        "hotel_id": room.hotel_id,
+        "date_from": "2030-01-01",
+        "date_to": date_to,
+    }
+
+    response = await client.get(url, params=params)
+
+    assert response.status_code == 400
+    assert await cache.keys("cache:hotels:*") == []
+    assert await cache.keys("cache:rooms:*") == []
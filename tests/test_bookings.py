@@ -0,0 +1,59 @@
+import asyncio
+from datetime import date
+
+import pytest
+from fastapi import HTTPException, status
+from sqlalchemy import select
+
+from app.bookings.schemas import SBookingsCreate
+from app.bookings.service import BookingsService
+from app.core.database import session_scope
+from app.rooms.models import RoomInventory
+
+pytestmark = pytest.mark.anyio
+
+ATTEMPTS = 20
+
+
+async def test_concurrent_bookings_sell_exactly_the_free_units(user, room):
+    booking = SBookingsCreate(
+        room_id=room.id, date_from=date(2030, 1, 1), date_to=date(2030, 1, 4)
+    )
+
+    results = await asyncio.gather(
+        *(BookingsService.add_booking(user.id, booking) for _ in range(ATTEMPTS)),
+        return_exceptions=True,
+    )
+
+    booked = [result for result in results if not isinstance(result, Exception)]
+    rejected = [result for result in results if isinstance(result, Exception)]
+    assert len(booked) == room.quantity
+    assert all(isinstance(error, HTTPException) for error in rejected), rejected
+    assert {error.status_code for error in rejected} == {status.HTTP_409_CONFLICT}
+
+    async with session_scope() as session:
+        nights = (
+            await session.execute(
+                select(RoomInventory.day, RoomInventory.booked)
+                .where(RoomInventory.room_id == room.id)
+                .order_by(RoomInventory.day)
+            )
+        ).all()
+    assert nights == [
+        (date(2030, 1, 1), room.quantity),
+        (date(2030, 1, 2), room.quantity),
+        (date(2030, 1, 3), room.quantity),
+    ]
+
+
+async def test_concurrent_booking_requests_sell_exactly_the_free_units(
+    auth_client, room
+):
+    payload = {"room_id": room.id, "date_from": "2030-02-01", "date_to": "2030-02-03"}
+
+    responses = await asyncio.gather(
+        *(auth_client.post("/bookings", json=payload) for _ in range(ATTEMPTS))
+    )
+
+    statuses = sorted(response.status_code for response in responses)
+    assert statuses == [200] * room.quantity + [409] * (ATTEMPTS - room.quantity)
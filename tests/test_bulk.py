@@ -0,0 +1,88 @@
+import pytest
+from sqlalchemy import delete, select
+
+from app.core.database import session_scope
+from app.rooms.models import Rooms
+
+pytestmark = pytest.mark.anyio
+
+CSV = {"Content-Type": "text/csv"}
+
+
+async def test_rooms_csv_round_trip(client, room):
+    async with session_scope() as session:
+        session.add_all(
+            [
+                Rooms(
+                    hotel_id=room.hotel_id,
+                    name="Suite, sea view",
+                    description='Balcony with "the" view\nand a second line',
+                    price=300,
+                    services=["Spa", "Wi-Fi"],
+                    quantity=1,
+                ),
+                Rooms(
+                    hotel_id=room.hotel_id,
+                    name="Family room",
+                    description="",
+                    price=150,
+                    quantity=2,
+                    image_id=7,
+                ),
+            ]
+        )
+
+    exported = await client.get("/rooms/export")
+    assert exported.status_code == 200
+    async with session_scope() as session:
+        before = (await session.scalars(select(Rooms).order_by(Rooms.id))).all()
+        await session.execute(delete(Rooms))
+
+    response = await client.post("/rooms/import", content=exported.content, headers=CSV)
+
+    assert response.status_code == 200, response.text
+    assert response.json() == {"imported": 3}
+    async with session_scope() as session:
+        after = (await session.scalars(select(Rooms).order_by(Rooms.id))).all()
+    columns = [column.key for column in Rooms.__table__.columns]
+    assert [[getattr(r, c) for c in columns] for r in after] == [
+        [getattr(r, c) for c in columns] for r in before
+    ]
+    assert [r.description for r in after] == [
+        None,
+        'Balcony with "the" view\nand a second line',
+        "",
+    ]
+    assert (await client.get("/rooms/export")).content == exported.content
+
+
+async def test_rooms_csv_import_reports_the_record_number(client, room):
+    body = (
+        "id,hotel_id,name,description,price,quantity\n"
+        f'10,{room.hotel_id},Standard,"two\nlines",100,1\n'
+        "\n"
+        f"11,{room.hotel_id},Deluxe,,not a price,1\n"
+    )
+
+    response = await client.post("/rooms/import", content=body, headers=CSV)
+
+    assert response.status_code == 422
+    assert [error["loc"] for error in response.json()["detail"]] == [
+        ["body", 2, "price"]
+    ]
+
+
+@pytest.mark.parametrize(
+    "fields", ["12,{hotel_id},Deluxe", "12,{hotel_id},Deluxe,,150,2,3,4"]
+)
+async def test_rooms_csv_import_rejects_a_wrong_field_count(client, room, fields):
+    body = (
+        "id,hotel_id,name,description,price,quantity,image_id\n"
+        f"10,{room.hotel_id},Standard,,100,1,3\n"
+        f"{fields.format(hotel_id=room.hotel_id)}\n"
+    )
+
+    response = await client.post("/rooms/import", content=body, headers=CSV)
+
+    assert response.status_code == 422
+    assert [error["loc"] for error in response.json()["detail"]] == [["body", 2]]
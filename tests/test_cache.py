@@ -0,0 +1,68 @@
+import asyncio
+import time
+
+import pytest
+from prometheus_client import REGISTRY
+
+from app.core.queries import track_queries
+
+pytestmark = pytest.mark.anyio
+
+PERIOD = {"date_from": "2030-01-01", "date_to": "2030-01-03"}
+
+
+async def test_legacy_entry_is_recomputed_and_replaced(client, cache, room):
+    params = {"hotel_id": room.hotel_id, **PERIOD}
+    response = await client.get("/rooms/available/period", params=params)
+    assert response.headers["x-fastapi-cache"] == "MISS"
+    [key] = await cache.keys("cache:rooms:*[0-9a-f]")
+    # a body stored by @cache, without the freshness header
+    await cache.set(key, b"[]", ex=60)
+
+    with track_queries() as stats:
+        response = await client.get("/rooms/available/period", params=params)
+
+    assert response.status_code == 200
+    assert response.headers["x-fastapi-cache"] == "MISS"
+    assert [room["id"] for room in response.json()] == [room.id]
+    assert stats.count > 0
+    fresh_until, body = (await cache.get(key)).split(b"\n", 1)
+    assert float(fresh_until) and body == response.content
+
+    response = await client.get("/rooms/available/period", params=params)
+    assert response.headers["x-fastapi-cache"] == "HIT"
+
+
+def lookups(result: str) -> float:
+    labels = {"namespace": "rooms", "result": result}
+    return REGISTRY.get_sample_value("cache_requests_total", labels) or 0
+
+
+async def test_lookups_are_counted_once_per_request(client, cache, room):
+    params = {"hotel_id": room.hotel_id, **PERIOD}
+    await client.get("/rooms/available/period", params=params)
+    [key] = await cache.keys("cache:rooms:*[0-9a-f]")
+    key = key.decode()
+    entry = await cache.get(key)
+    await cache.delete(key)
+    # another process computes the entry, this request waits for it
+    await cache.set(f"{key}:lock", "other", px=10_000)
+
+    async def store_later():
+        await asyncio.sleep(0.3)
+        await cache.set(key, entry)
+
+    misses, hits = lookups("miss"), lookups("hit")
+    _, response = await asyncio.gather(
+        store_later(), client.get("/rooms/available/period", params=params)
+    )
+
+    assert response.content == entry.split(b"\n", 1)[1]
+    assert lookups("miss") - misses == 1
+
+    stale = lookups("stale")
+    await cache.set(key, f"{time.time() - 1:.3f}\n".encode() + b"[]")
+    response = await client.get("/rooms/available/period", params=params)
+
+    assert response.headers["x-fastapi-cache"] == "STALE"
+    assert (lookups("stale") - stale, lookups("hit") - hits) == (1, 0)
@@ -0,0 +1,49 @@
+from datetime import date
+
+import pytest
+from sqlalchemy import insert
+
+from app.core.database import session_scope
+from app.hotels.models import HotelStats
+
+pytestmark = pytest.mark.anyio
+
+PERIOD = {"date_from": "2030-01-01", "date_to": "2030-01-31"}
+
+
+@pytest.fixture
+async def stats(room) -> None:
+    async with session_scope() as session:
+        await session.execute(
+            insert(HotelStats).values(
+                hotel_id=room.hotel_id,
+                day=date(2030, 1, 2),
+                rooms_total=3,
+                rooms_booked=1,
+                check_ins=1,
+                nights_sold=2,
+                revenue=200,
+            )
+        )
+
+
+async def test_hotel_stats_need_the_admin_session(client, room, stats):
+    response = await client.get(f"/hotels/{room.hotel_id}/stats", params=PERIOD)
+
+    assert response.status_code == 401
+
+
+async def test_hotel_stats(admin_client, room, stats):
+    response = await admin_client.get(f"/hotels/{room.hotel_id}/stats", params=PERIOD)
+
+    assert response.status_code == 200
+    assert response.json() == [
+        {
+            "day": "2030-01-02",
+            "rooms_total": 3,
+            "rooms_booked": 1,
+            "check_ins": 1,
+            "nights_sold": 2,
+            "revenue": 200,
+        }
+    ]
@@ -0,0 +1,89 @@
+"""Query counts of the hot endpoints, pinned so that N+1 patterns fail.
+
+The data has several hotels, rooms and bookings, so a query per row would
+exceed the limits.
+"""
+
+from datetime import date, timedelta
+
+import pytest
+
+from app.bookings.models import Bookings
+from app.core.database import session_scope
+from app.core.queries import assert_max_queries
+from app.hotels.models import Hotels
+from app.rooms.models import Rooms
+
+pytestmark = pytest.mark.anyio
+
+NO_CACHE = {"Cache-Control": "no-cache"}
+PERIOD = {"date_from": "2030-01-01", "date_to": "2030-01-04"}
+
+
+@pytest.fixture
+async def rooms(db, user) -> list[Rooms]:
+    async with session_scope() as session:
+        hotels = [
+            Hotels(
+                name=f"Hotel {number}",
+                city="Paris",
+                location=f"{number} Main Street",
+                services=["Wi-Fi"],
+                rooms_quantity=6,
+                image_id=str(number),
+            )
+            for number in range(3)
+        ]
+        session.add_all(hotels)
+        await session.flush()
+        rooms = [
+            Rooms(hotel_id=hotel.id, name=name, price=100, quantity=2)
+            for hotel in hotels
+            for name in ("Standard", "Deluxe", "Suite")
+        ]
+        session.add_all(rooms)
+        await session.flush()
+        session.add_all(
+            Bookings(
+                room_id=room.id,
+                user_id=user.id,
+                date_from=date(2030, 1, 1) + timedelta(days=number),
+                date_to=date(2030, 1, 3) + timedelta(days=number),
+                price=room.price,
+            )
+            for number, room in enumerate(rooms)
+        )
+    return rooms
+
+
+async def test_search_hotels_queries(client, rooms):
+    with assert_max_queries(1):
+        response = await client.get(
+            "/hotels/search", params={"city": "Paris", **PERIOD}, headers=NO_CACHE
+        )
+    assert len(response.json()) == 3
+
+
+async def test_rooms_for_period_queries(client, rooms):
+    params = {"hotel_id": rooms[0].hotel_id, **PERIOD}
+    with assert_max_queries(1):
+        response = await client.get(
+            "/rooms/available/period", params=params, headers=NO_CACHE
+        )
+    assert len(response.json()) == 3
+
+
+async def test_list_bookings_queries(auth_client, rooms):
+    await auth_client.get("/bookings", headers=NO_CACHE)  # warms the user cache
+    with assert_max_queries(1):
+        response = await auth_client.get("/bookings", headers=NO_CACHE)
+    assert len(response.json()) == len(rooms)
+
+
+async def test_add_booking_queries(auth_client, rooms):
+    await auth_client.get("/bookings", headers=NO_CACHE)  # warms the user cache
+    payload = {"room_id": rooms[0].id, **PERIOD}
+    # lock, availability, insert, inventory, outbox and the hotel to invalidate
+    with assert_max_queries(6):
+        response = await auth_client.post("/bookings", json=payload)
+    assert response.status_code == 200, response.text